@@ -0,0 +1,147 @@
+"""Trigger-maintained project statistics columns
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-01-22 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    verification_status = postgresql.ENUM(
+        'pending', 'indexing', 'processing', 'completed', 'failed',
+        name='verificationstatus',
+        create_type=False
+    )
+
+    # Denormalized statistics columns
+    op.add_column('projects', sa.Column('document_count', sa.Integer, nullable=False, server_default='0'))
+    op.add_column('projects', sa.Column('supporting_document_count', sa.Integer, nullable=False, server_default='0'))
+    op.add_column('projects', sa.Column('latest_job_id', postgresql.UUID(as_uuid=True)))
+    op.add_column('projects', sa.Column('latest_job_status', verification_status))
+    op.create_foreign_key(
+        'fk_projects_latest_job_id',
+        'projects', 'verification_jobs',
+        ['latest_job_id'], ['id'],
+        ondelete='SET NULL'
+    )
+
+    # Only bump updated_at on user-facing edits, not on counter maintenance
+    op.execute("DROP TRIGGER IF EXISTS update_projects_updated_at ON projects")
+    op.execute("""
+        CREATE TRIGGER update_projects_updated_at
+        BEFORE UPDATE OF name, description, background_context ON projects
+        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+    """)
+
+    # Document counters
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_project_document_counts()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE projects
+                SET document_count = document_count + 1,
+                    supporting_document_count = supporting_document_count
+                        + CASE WHEN NEW.document_type = 'supporting' THEN 1 ELSE 0 END
+                WHERE id = NEW.project_id;
+                RETURN NEW;
+            ELSE
+                UPDATE projects
+                SET document_count = document_count - 1,
+                    supporting_document_count = supporting_document_count
+                        - CASE WHEN OLD.document_type = 'supporting' THEN 1 ELSE 0 END
+                WHERE id = OLD.project_id;
+                RETURN OLD;
+            END IF;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER update_project_document_counts AFTER INSERT OR DELETE ON documents
+        FOR EACH ROW EXECUTE FUNCTION update_project_document_counts();
+    """)
+
+    # Latest job pointer and status
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_project_latest_job()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE projects
+                SET latest_job_id = NEW.id,
+                    latest_job_status = NEW.status
+                WHERE id = NEW.project_id;
+            ELSE
+                UPDATE projects
+                SET latest_job_status = NEW.status
+                WHERE id = NEW.project_id AND latest_job_id = NEW.id;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER update_project_latest_job_insert AFTER INSERT ON verification_jobs
+        FOR EACH ROW EXECUTE FUNCTION update_project_latest_job();
+    """)
+    op.execute("""
+        CREATE TRIGGER update_project_latest_job_status AFTER UPDATE OF status ON verification_jobs
+        FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION update_project_latest_job();
+    """)
+
+    # Backfill existing projects
+    op.execute("""
+        UPDATE projects p
+        SET document_count = d.total,
+            supporting_document_count = d.supporting
+        FROM (
+            SELECT project_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE document_type = 'supporting') AS supporting
+            FROM documents
+            GROUP BY project_id
+        ) d
+        WHERE d.project_id = p.id;
+    """)
+    op.execute("""
+        UPDATE projects p
+        SET latest_job_id = j.id,
+            latest_job_status = j.status
+        FROM (
+            SELECT DISTINCT ON (project_id) project_id, id, status
+            FROM verification_jobs
+            ORDER BY project_id, created_at DESC
+        ) j
+        WHERE j.project_id = p.id;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS update_project_latest_job_status ON verification_jobs")
+    op.execute("DROP TRIGGER IF EXISTS update_project_latest_job_insert ON verification_jobs")
+    op.execute("DROP FUNCTION IF EXISTS update_project_latest_job()")
+    op.execute("DROP TRIGGER IF EXISTS update_project_document_counts ON documents")
+    op.execute("DROP FUNCTION IF EXISTS update_project_document_counts()")
+
+    op.execute("DROP TRIGGER IF EXISTS update_projects_updated_at ON projects")
+    op.execute("""
+        CREATE TRIGGER update_projects_updated_at BEFORE UPDATE ON projects
+        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+    """)
+
+    op.drop_constraint('fk_projects_latest_job_id', 'projects', type_='foreignkey')
+    op.drop_column('projects', 'latest_job_status')
+    op.drop_column('projects', 'latest_job_id')
+    op.drop_column('projects', 'supporting_document_count')
+    op.drop_column('projects', 'document_count')
@@ -0,0 +1,51 @@
+"""Generated tsvector columns for chunk and sentence full-text search
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-01-22 00:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stored generated columns replace the expression indexes from 001
+    op.execute("""
+        ALTER TABLE document_chunks
+        ADD COLUMN content_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', content)) STORED;
+    """)
+    op.execute("""
+        ALTER TABLE verified_sentences
+        ADD COLUMN content_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', content)) STORED;
+    """)
+
+    op.execute("DROP INDEX IF EXISTS idx_chunks_content_fulltext")
+    op.execute("DROP INDEX IF EXISTS idx_sentences_content_fulltext")
+
+    op.create_index('idx_chunks_content_tsv', 'document_chunks', ['content_tsv'], postgresql_using='gin')
+    op.create_index('idx_sentences_content_tsv', 'verified_sentences', ['content_tsv'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sentences_content_tsv', 'verified_sentences')
+    op.drop_index('idx_chunks_content_tsv', 'document_chunks')
+
+    op.drop_column('verified_sentences', 'content_tsv')
+    op.drop_column('document_chunks', 'content_tsv')
+
+    op.execute("""
+        CREATE INDEX idx_chunks_content_fulltext ON document_chunks
+        USING gin(to_tsvector('english', content));
+    """)
+    op.execute("""
+        CREATE INDEX idx_sentences_content_fulltext ON verified_sentences
+        USING gin(to_tsvector('english', content));
+    """)
@@ -0,0 +1,38 @@
+"""Partial index over unindexed documents
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-01-29 00:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Only rows still waiting to be indexed are kept in the index, so project
+    # indexing scans stay small as indexed documents accumulate
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_doc_unindexed',
+            'documents',
+            ['project_id'],
+            postgresql_where='indexed = false',
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_doc_unindexed',
+            'documents',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
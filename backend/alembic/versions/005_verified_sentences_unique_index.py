@@ -0,0 +1,60 @@
+"""Unique sentence index per verification job
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-02-03 00:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Drop duplicates left by earlier retried jobs, keeping the first row saved
+    op.execute("""
+        DELETE FROM verified_sentences a
+        USING verified_sentences b
+        WHERE a.verification_job_id = b.verification_job_id
+          AND a.sentence_index = b.sentence_index
+          AND a.ctid > b.ctid;
+    """)
+
+    # Resumed jobs insert with ON CONFLICT DO NOTHING against this index; it
+    # also serves job_id lookups, so idx_sentences_job_id is redundant
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_sentences_job_sentence_index',
+            'verified_sentences',
+            ['verification_job_id', 'sentence_index'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index(
+            'idx_sentences_job_id',
+            'verified_sentences',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_sentences_job_id',
+            'verified_sentences',
+            ['verification_job_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index(
+            'uq_sentences_job_sentence_index',
+            'verified_sentences',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -0,0 +1,25 @@
+"""Indexing claim timestamp on documents
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-02-05 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Indexing workers claim a document by setting this in a short committed
+    # update instead of holding a row lock for the whole run
+    op.add_column('documents', sa.Column('indexing_started_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'indexing_started_at')
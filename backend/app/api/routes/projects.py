@@ -7,8 +7,8 @@ from typing import List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, and_, true
+from sqlalchemy.orm import aliased, selectinload, joinedload
 
 from app.db.session import get_db
 from app.db.models import (
@@ -20,7 +20,7 @@ from app.schemas.project import (
     PaginatedProjectsResponse
 )
 from app.schemas.document import DocumentResponse
-from app.services.storage_service import StorageService
+from app.services.storage_service import storage_service
 from app.services.document_processor import DocumentProcessor
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -34,7 +34,8 @@ async def list_projects(
 ):
     """
     List all projects with pagination
-    Returns projects with document count and latest job stats
+    Returns projects with document counts and latest job stats.
+    Supporting documents are only listed on the single-project endpoint.
     """
     if page < 1 or per_page < 1 or per_page > 100:
         raise HTTPException(status_code=400, detail="Invalid pagination parameters")
@@ -46,35 +47,36 @@ async def list_projects(
     total_result = await db.execute(count_query)
     total = total_result.scalar()
 
-    # Get projects with relationships
-    query = (
-        select(Project)
-        .options(
-            selectinload(Project.documents),
-            selectinload(Project.verification_jobs)
+    # Counts and latest job come from trigger-maintained columns on projects,
+    # so only the main document needs a join. It is a LATERAL ... LIMIT 1 so
+    # a project with more than one MAIN document still yields a single row.
+    main_doc_subquery = (
+        select(Document)
+        .where(
+            Document.project_id == Project.id,
+            Document.document_type == DocumentType.MAIN
         )
+        .order_by(Document.created_at, Document.id)
+        .limit(1)
+        .lateral()
+    )
+    main_doc_alias = aliased(Document, main_doc_subquery)
+    query = (
+        select(Project, main_doc_alias)
+        .outerjoin(main_doc_subquery, true())
+        .options(joinedload(Project.latest_job))
         .order_by(Project.created_at.desc())
         .offset(offset)
         .limit(per_page)
     )
 
     result = await db.execute(query)
-    projects = result.scalars().all()
+    rows = result.all()
 
     # Build response with stats
     items = []
-    for project in projects:
-        # Count documents
-        doc_count = len(project.documents)
-
-        # Get main document
-        main_doc = next((d for d in project.documents if d.document_type == DocumentType.MAIN), None)
-
-        # Get supporting documents
-        supporting_docs = [d for d in project.documents if d.document_type == DocumentType.SUPPORTING]
-
-        # Get latest job
-        latest_job = max(project.verification_jobs, key=lambda j: j.created_at) if project.verification_jobs else None
+    for project, main_doc in rows:
+        latest_job = project.latest_job
 
         items.append({
             "id": str(project.id),
@@ -83,9 +85,9 @@ async def list_projects(
             "background_context": project.background_context,
             "created_at": project.created_at.isoformat(),
             "updated_at": project.updated_at.isoformat(),
-            "document_count": doc_count,
+            "document_count": project.document_count,
+            "supporting_document_count": project.supporting_document_count,
             "main_document": DocumentResponse.from_orm(main_doc) if main_doc else None,
-            "supporting_documents": [DocumentResponse.from_orm(d) for d in supporting_docs],
             "latest_job": {
                 "id": str(latest_job.id),
                 "status": latest_job.status.value,
@@ -247,14 +249,12 @@ async def delete_project(
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Delete from storage
-    storage_service = StorageService()
-    for document in db_project.documents:
-        try:
-            storage_service.delete_file(document.file_path)
-        except Exception as e:
-            # Log but don't fail delete
-            print(f"Warning: Could not delete file {document.file_path}: {e}")
+    # Delete from storage (all project files in one batched request)
+    try:
+        await storage_service.delete_project_files(project_id)
+    except Exception as e:
+        # Log but don't fail delete
+        print(f"Warning: Could not delete files for project {project_id}: {e}")
 
     await db.delete(db_project)
     await db.commit()
@@ -302,32 +302,30 @@ async def upload_documents(
             raise HTTPException(status_code=400, detail="Only one main document allowed")
 
     # Process uploads
-    storage_service = StorageService()
     processor = DocumentProcessor()
     uploaded_docs = []
 
+    # Validate file types before uploading anything
     for file in files:
-        # Validate file type
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail=f"Invalid file type: {file.filename}. Only PDF files allowed")
 
-        # Upload to storage
-        try:
-            file_path = storage_service.upload_file(
-                file.file,
-                file.filename,
-                project_id,
-                file.content_type
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    # Upload to storage concurrently
+    try:
+        file_paths = await storage_service.upload_files(
+            [(file.file, file.filename, file.content_type) for file in files],
+            project_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+    for file, file_path in zip(files, file_paths):
         # Extract metadata
         try:
             metadata = await processor.extract_metadata(file_path)
         except Exception as e:
             # Clean up uploaded file
-            storage_service.delete_file(file_path)
+            await storage_service.delete_file(file_path)
             raise HTTPException(status_code=500, detail=f"PDF processing failed: {str(e)}")
 
         # Create document record
@@ -4,6 +4,7 @@ Verified Sentences API endpoints
 
 from typing import Optional
 from uuid import UUID
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -242,12 +243,12 @@ async def search_sentences(
             "pages": 0
         }
 
-    # Full-text search query
+    # Full-text search query (GIN index on the generated content_tsv column)
     search_term = q.strip()
     query = select(VerifiedSentence).where(
         and_(
             VerifiedSentence.verification_job_id.in_(job_ids),
-            VerifiedSentence.content.ilike(f"%{search_term}%")
+            VerifiedSentence.content_tsv.op("@@")(func.plainto_tsquery('english', search_term))
         )
     )
 
@@ -359,8 +360,9 @@ async def export_verification_results(
             )
         )
     
-    # Generate Excel file
-    excel_file = ExcelExportService.export_verification_results(
+    # Generate Excel file in a worker thread so the event loop stays responsive
+    excel_file = await asyncio.to_thread(
+        ExcelExportService.export_verification_results,
         sentences=sentence_responses,
         project_name=project_name
     )
@@ -369,7 +371,7 @@ async def export_verification_results(
     filename = f"{project_name.replace(' ', '_')}_verification_results.xlsx"
     
     return StreamingResponse(
-        excel_file,
+        ExcelExportService.iter_file(excel_file),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -69,7 +69,7 @@ async def upload_document(
             file.file.seek(0)
 
             # Upload to Supabase Storage
-            storage_path = storage_service.upload_file(
+            storage_path = await storage_service.upload_file(
                 file=file.file,
                 filename=unique_filename,
                 project_id=project_id,
@@ -327,14 +327,14 @@ async def delete_document(
 
         # Delete file from storage
         if settings.USE_SUPABASE_STORAGE:
-            storage_service.delete_file(document.file_path)
+            await storage_service.delete_file(document.file_path)
         else:
             if os.path.exists(document.file_path):
                 os.remove(document.file_path)
 
         # Delete from Weaviate
         from app.services.vector_store import vector_store
-        vector_store.delete_document_chunks(document.project_id, document_id)
+        await vector_store.delete_document_chunks(document.project_id, document_id)
 
         # Delete document record (cascades to chunks)
         await db.delete(document)
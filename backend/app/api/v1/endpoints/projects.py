@@ -30,7 +30,7 @@ async def create_project(
         await db.refresh(project)
 
         # Create Weaviate schema for project
-        vector_store.create_schema(project.id)
+        await vector_store.create_schema(project.id)
 
         logger.info(f"Created project {project.id}")
         return project
@@ -198,7 +198,7 @@ async def delete_project(
             )
 
         # Delete Weaviate collection
-        vector_store.delete_collection(project_id)
+        await vector_store.delete_collection(project_id)
 
         # Delete project (cascades to documents and jobs)
         await db.delete(project)
@@ -1,14 +1,16 @@
 """Verification endpoints."""
 
-from typing import List
+from typing import AsyncIterator, List
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from loguru import logger
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import get_db, AsyncSessionLocal
 from app.db.models import (
     VerificationJob, Project, Document, VerifiedSentence,
     VerificationStatus, DocumentType
@@ -21,6 +23,8 @@ from app.tasks.verification_tasks import run_verification_task
 
 router = APIRouter()
 
+_sentence_list_adapter = TypeAdapter(List[VerifiedSentenceSchema])
+
 
 @router.post("/jobs", response_model=VerificationJobResponse, status_code=status.HTTP_201_CREATED)
 async def create_verification_job(
@@ -158,13 +162,9 @@ async def get_verification_job(
 ):
     """Get verification job details with sentences."""
     try:
-        # Build query
-        query = select(VerificationJob).where(VerificationJob.id == job_id)
-
-        if include_sentences:
-            query = query.options(selectinload(VerificationJob.sentences))
-
-        result = await db.execute(query)
+        result = await db.execute(
+            select(VerificationJob).where(VerificationJob.id == job_id)
+        )
         job = result.scalar_one_or_none()
 
         if not job:
@@ -173,47 +173,17 @@ async def get_verification_job(
                 detail="Verification job not found"
             )
 
-        # Convert to response model
-        job_dict = {
-            "id": job.id,
-            "project_id": job.project_id,
-            "main_document_id": job.main_document_id,
-            "status": job.status,
-            "progress": job.progress,
-            "total_sentences": job.total_sentences,
-            "verified_sentences": job.verified_sentences,
-            "validated_count": job.validated_count,
-            "uncertain_count": job.uncertain_count,
-            "incorrect_count": job.incorrect_count,
-            "celery_task_id": job.celery_task_id,
-            "started_at": job.started_at,
-            "completed_at": job.completed_at,
-            "created_at": job.created_at,
-            "updated_at": job.updated_at,
-            "error_message": job.error_message,
-            "sentences": []
-        }
+        job_response = VerificationJobResponse.model_validate(job)
+
+        if not include_sentences:
+            return VerificationJobDetail(**job_response.model_dump(), sentences=[])
 
-        if include_sentences and job.sentences:
-            # Convert sentences with citations
-            for sentence in job.sentences:
-                sentence_dict = {
-                    "id": sentence.id,
-                    "sentence_index": sentence.sentence_index,
-                    "content": sentence.content,
-                    "page_number": sentence.page_number,
-                    "start_char": sentence.start_char,
-                    "end_char": sentence.end_char,
-                    "validation_result": sentence.validation_result,
-                    "confidence_score": sentence.confidence_score,
-                    "reasoning": sentence.reasoning,
-                    "citations": sentence.citations or [],
-                    "manually_reviewed": sentence.manually_reviewed,
-                    "reviewer_notes": sentence.reviewer_notes
-                }
-                job_dict["sentences"].append(sentence_dict)
-
-        return VerificationJobDetail(**job_dict)
+        # Sentences can number in the tens of thousands, so they are streamed
+        # from a server-side cursor instead of being loaded into memory at once
+        return StreamingResponse(
+            _stream_job_detail(job_response),
+            media_type="application/json"
+        )
 
     except HTTPException:
         raise
@@ -225,6 +195,37 @@ async def get_verification_job(
         )
 
 
+async def _stream_job_detail(job: VerificationJobResponse) -> AsyncIterator[bytes]:
+    """
+    Stream a VerificationJobDetail JSON document partition by partition.
+
+    Uses its own session because the request-scoped session is closed
+    before the response body is sent.
+    """
+    header = job.model_dump_json()
+    yield header[:-1].encode() + b',"sentences":['
+
+    stmt = (
+        select(VerifiedSentence)
+        .where(VerifiedSentence.verification_job_id == job.id)
+        .order_by(VerifiedSentence.sentence_index)
+        .execution_options(yield_per=settings.DB_STREAM_YIELD_PER)
+    )
+
+    first = True
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt)
+        async for partition in result.scalars().partitions():
+            sentences = _sentence_list_adapter.validate_python(partition, from_attributes=True)
+            payload = _sentence_list_adapter.dump_json(sentences)[1:-1]
+            if not payload:
+                continue
+            yield payload if first else b"," + payload
+            first = False
+
+    yield b"]}"
+
+
 @router.get("/jobs/project/{project_id}", response_model=List[VerificationJobResponse])
 async def list_project_verification_jobs(
     project_id: UUID,
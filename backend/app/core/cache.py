@@ -0,0 +1,91 @@
+"""Result cache for embeddings and LLM verifications."""
+
+import hashlib
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from aiocache import Cache
+from aiocache.serializers import PickleSerializer
+from loguru import logger
+
+from app.core.config import settings
+
+
+def _create_cache() -> Cache:
+    """Create the configured cache backend."""
+    if settings.CACHE_BACKEND == "redis":
+        url = urlparse(settings.REDIS_URL)
+        return Cache(
+            Cache.REDIS,
+            endpoint=url.hostname or "localhost",
+            port=url.port or 6379,
+            db=int(url.path.lstrip("/") or 0),
+            password=url.password,
+            namespace="verify",
+            serializer=PickleSerializer(),
+        )
+
+    return Cache(Cache.MEMORY, namespace="verify", serializer=PickleSerializer())
+
+
+def cache_key(*parts: Any) -> str:
+    """
+    Build a content-hash cache key.
+
+    Args:
+        parts: Values identifying the cached result (model, inputs, ...)
+
+    Returns:
+        Hex SHA-256 digest of the parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Get a cached value, treating cache errors as misses."""
+    if not settings.CACHE_ENABLED:
+        return None
+    try:
+        return await result_cache.get(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed: {e}")
+        return None
+
+
+async def cache_multi_get(keys: List[str]) -> List[Optional[Any]]:
+    """Get several cached values, treating cache errors as misses."""
+    if not settings.CACHE_ENABLED or not keys:
+        return [None] * len(keys)
+    try:
+        return await result_cache.multi_get(keys)
+    except Exception as e:
+        logger.warning(f"Cache multi_get failed: {e}")
+        return [None] * len(keys)
+
+
+async def cache_set(key: str, value: Any, ttl: int = None) -> None:
+    """Store a value, ignoring cache errors."""
+    if not settings.CACHE_ENABLED:
+        return
+    try:
+        await result_cache.set(key, value, ttl=ttl or settings.CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Cache set failed: {e}")
+
+
+async def cache_multi_set(items: Dict[str, Any], ttl: int = None) -> None:
+    """Store several values, ignoring cache errors."""
+    if not settings.CACHE_ENABLED or not items:
+        return
+    try:
+        await result_cache.multi_set(list(items.items()), ttl=ttl or settings.CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Cache multi_set failed: {e}")
+
+
+# Singleton instance
+result_cache = _create_cache()
@@ -0,0 +1,27 @@
+"""Shared HTTP client for outbound API calls."""
+
+import httpx
+from loguru import logger
+
+from app.core.config import settings
+
+# One pooled HTTP/2 client shared by the OpenAI and LangChain clients, so
+# connections and TLS sessions are reused across embedding and chat requests.
+# Gemini goes through the Google SDK's own gRPC transport, and the Mistral SDK
+# client keeps its own pool and retries.
+http_client = httpx.AsyncClient(
+    http2=True,
+    follow_redirects=True,
+    limits=httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    ),
+    timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+)
+
+
+async def close_http_client():
+    """Close the shared HTTP client."""
+    await http_client.aclose()
+    logger.info("HTTP client closed")
@@ -0,0 +1,36 @@
+"""Shared async Redis client for pub/sub progress updates."""
+
+from typing import Optional
+
+from redis.asyncio import Redis
+from loguru import logger
+
+from app.core.config import settings
+
+_redis_client: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """
+    Get the shared Redis client, creating it on first use.
+
+    The client's connection pool is bound to the event loop it first runs
+    on, so it is created lazily rather than at import time.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = Redis.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            decode_responses=False,
+        )
+    return _redis_client
+
+
+async def close_redis():
+    """Close the shared Redis client."""
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
+        logger.info("Redis client closed")
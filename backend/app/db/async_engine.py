@@ -0,0 +1,74 @@
+"""Database engine for Celery worker processes, created lazily per process."""
+
+import asyncio
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from loguru import logger
+
+from app.core.config import settings
+from app.db.session import CONNECT_ARGS, DATABASE_URL
+
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[async_sessionmaker] = None
+_engine_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _create_engine() -> AsyncEngine:
+    """Create a pooled engine sized for one worker process."""
+    return create_async_engine(
+        DATABASE_URL,
+        pool_size=settings.WORKER_DB_POOL_SIZE,
+        max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=False,
+        pool_use_lifo=True,
+        connect_args=CONNECT_ARGS,
+    )
+
+
+def reset_engine():
+    """
+    Forget the current engine without closing its connections.
+
+    Called in each forked worker process so it never reuses connections
+    inherited from the parent.
+    """
+    global _engine, _session_factory, _engine_loop
+    if _engine is not None:
+        _engine.sync_engine.dispose(close=False)
+    _engine = _session_factory = _engine_loop = None
+
+
+def get_async_session() -> AsyncSession:
+    """
+    Create a session on the worker's pooled engine.
+
+    asyncpg connections belong to the event loop that opened them, so the
+    engine is rebuilt if called from a different loop than last time.
+    """
+    global _engine, _session_factory, _engine_loop
+    loop = asyncio.get_running_loop()
+    if _engine is None or _engine_loop is not loop:
+        reset_engine()
+        _engine = _create_engine()
+        _session_factory = async_sessionmaker(
+            _engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+        _engine_loop = loop
+        logger.debug("Created worker database engine")
+
+    return _session_factory()
+
+
+async def dispose_engine():
+    """Close the worker engine's pooled connections."""
+    global _engine, _session_factory, _engine_loop
+    if _engine is not None:
+        await _engine.dispose()
+        logger.info("Worker database connections closed")
+    _engine = _session_factory = _engine_loop = None
@@ -3,10 +3,10 @@
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Text, DateTime, Boolean,
-    Float, JSON, ForeignKey, Enum as SQLEnum
+    Float, JSON, ForeignKey, Computed, Enum as SQLEnum
 )
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
 import uuid
 import enum
 
@@ -48,9 +48,24 @@ class Project(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Denormalized statistics (maintained by database triggers)
+    document_count = Column(Integer, default=0, server_default="0", nullable=False)
+    supporting_document_count = Column(Integer, default=0, server_default="0", nullable=False)
+    latest_job_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("verification_jobs.id", ondelete="SET NULL", use_alter=True)
+    )
+    latest_job_status = Column(SQLEnum(VerificationStatus))
+
     # Relationships
     documents = relationship("Document", back_populates="project", cascade="all, delete-orphan")
-    verification_jobs = relationship("VerificationJob", back_populates="project", cascade="all, delete-orphan")
+    verification_jobs = relationship(
+        "VerificationJob",
+        back_populates="project",
+        cascade="all, delete-orphan",
+        foreign_keys="VerificationJob.project_id"
+    )
+    latest_job = relationship("VerificationJob", foreign_keys=[latest_job_id], viewonly=True)
 
 
 class Document(Base):
@@ -69,6 +84,7 @@ class Document(Base):
     page_count = Column(Integer)
     indexed = Column(Boolean, default=False)
     indexed_at = Column(DateTime)
+    indexing_started_at = Column(DateTime)  # Set while a worker holds the indexing claim
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Metadata
@@ -88,6 +104,7 @@ class DocumentChunk(Base):
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     chunk_index = Column(Integer, nullable=False)
     content = Column(Text, nullable=False)
+    content_tsv = deferred(Column(TSVECTOR, Computed("to_tsvector('english', content)", persisted=True)))
     page_number = Column(Integer)
     start_char = Column(Integer)
     end_char = Column(Integer)
@@ -136,7 +153,7 @@ class VerificationJob(Base):
     error_message = Column(Text)
 
     # Relationships
-    project = relationship("Project", back_populates="verification_jobs")
+    project = relationship("Project", back_populates="verification_jobs", foreign_keys=[project_id])
     main_document = relationship("Document", foreign_keys=[main_document_id])
     sentences = relationship("VerifiedSentence", back_populates="verification_job", cascade="all, delete-orphan")
 
@@ -152,6 +169,7 @@ class VerifiedSentence(Base):
     # Sentence information
     sentence_index = Column(Integer, nullable=False)
     content = Column(Text, nullable=False)
+    content_tsv = deferred(Column(TSVECTOR, Computed("to_tsvector('english', content)", persisted=True)))
     page_number = Column(Integer)
     start_char = Column(Integer)
     end_char = Column(Integer)
@@ -2,7 +2,6 @@
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool, QueuePool
 from loguru import logger
 
 from app.core.config import settings
@@ -10,16 +9,30 @@ from app.core.config import settings
 # Convert PostgreSQL URL to async version
 DATABASE_URL = settings.DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://')
 
-# Create async engine with connection pooling
+# asyncpg connection options, shared with the Celery worker engine
+CONNECT_ARGS = {
+    "server_settings": {
+        "jit": "off",
+        "tcp_keepalives_idle": "60",
+    },
+    "command_timeout": settings.DB_COMMAND_TIMEOUT,
+    "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+}
+
+# Create async engine with a persistent LIFO connection pool.
+# pool_pre_ping is disabled: it costs a SELECT 1 round-trip on every checkout.
+# Stale connections are handled by pool_recycle and server-side TCP keepalives.
 engine = create_async_engine(
     DATABASE_URL,
     echo=settings.DEBUG,
-    poolclass=QueuePool,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
     pool_timeout=settings.DB_POOL_TIMEOUT,
     pool_recycle=settings.DB_POOL_RECYCLE,
-    pool_pre_ping=True,  # Verify connections before using
+    pool_pre_ping=False,
+    pool_use_lifo=True,  # Keep a hot subset of connections, let the rest idle out
+    connect_args=CONNECT_ARGS,
 )
 
 # Create async session factory
@@ -4,23 +4,26 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 import socketio
 
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.http import close_http_client
 from app.db.session import engine, init_db
 from app.api.v1.router import api_router
 
 # Setup logging
 setup_logging()
 
-# Create Socket.IO server for real-time updates
+# Create Socket.IO server for real-time updates.
+# Packet-level logging is only enabled in debug: it logs every frame.
 sio = socketio.AsyncServer(
     async_mode='asgi',
     cors_allowed_origins=settings.CORS_ORIGINS.split(','),
-    logger=True,
-    engineio_logger=True
+    logger=settings.DEBUG,
+    engineio_logger=settings.DEBUG
 )
 
 
@@ -38,6 +41,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down...")
     await engine.dispose()
     logger.info("Database connections closed")
+    await close_http_client()
 
 
 # Create FastAPI app
@@ -48,6 +52,7 @@ app = FastAPI(
     docs_url=f"{settings.API_V1_PREFIX}/docs",
     redoc_url=f"{settings.API_V1_PREFIX}/redoc",
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
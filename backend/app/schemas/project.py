@@ -53,17 +53,22 @@ class VerificationJobSummary(BaseModel):
     completed_at: Optional[datetime] = None
 
 
-class ProjectWithStatsResponse(ProjectResponse):
-    """Project with full statistics"""
+class ProjectSummaryResponse(ProjectResponse):
+    """Project with statistics, as listed (no supporting documents)"""
     document_count: int
+    supporting_document_count: int = 0
     main_document: Optional[DocumentResponse] = None
-    supporting_documents: List[DocumentResponse] = []
     latest_job: Optional[VerificationJobSummary] = None
 
 
+class ProjectWithStatsResponse(ProjectSummaryResponse):
+    """Project with full statistics"""
+    supporting_documents: List[DocumentResponse] = []
+
+
 class PaginatedProjectsResponse(BaseModel):
     """Paginated list of projects"""
-    items: List[ProjectWithStatsResponse]
+    items: List[ProjectSummaryResponse]
     total: int
     page: int
     per_page: int
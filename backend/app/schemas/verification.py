@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 from app.db.models import VerificationStatus, ValidationResult
 
@@ -37,6 +37,12 @@ class VerifiedSentenceSchema(BaseModel):
 
     model_config = {"from_attributes": True}
 
+    @field_validator("citations", mode="before")
+    @classmethod
+    def _default_citations(cls, value):
+        """Treat NULL citations columns as an empty list."""
+        return value or []
+
 
 class VerificationJobCreate(BaseModel):
     """Schema for creating a verification job."""
@@ -1,15 +1,18 @@
 """Document processing service for PDF and DOCX files."""
 
+import asyncio
 import os
 import re
-from typing import List, Dict, Tuple
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from loguru import logger
 
 import PyPDF2
 import pdfplumber
 from docx import Document as DocxDocument
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from nltk.tokenize import sent_tokenize
 import nltk
 
@@ -19,37 +22,47 @@ try:
 except LookupError:
     nltk.download('punkt')
 
+# Candidate chunk boundaries: paragraph, line, sentence and word breaks
+_BREAK_RE = re.compile(r"\n\n|\n|\. | ")
+
+# Extraction results keyed by (path, mtime) so a document parsed for indexing
+# is not re-parsed for verification in the same worker process
+_EXTRACTION_CACHE_SIZE = 32
+_extraction_cache: "OrderedDict[Tuple[str, float], Dict]" = OrderedDict()
+
 
 class DocumentProcessor:
     """Service for processing documents (PDF, DOCX) and extracting text."""
 
-    def __init__(self, chunk_size: int = 512, chunk_overlap: int = 128):
+    def __init__(self, chunk_size: int = 512, chunk_overlap: int = 128, stride: Optional[int] = None):
         """
         Initialize document processor.
 
         Args:
             chunk_size: Size of text chunks for embedding
             chunk_overlap: Overlap between chunks
+            stride: Sliding-window step between chunk starts; when given it
+                overrides chunk_overlap (overlap = chunk_size - stride)
         """
         self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", ". ", " ", ""],
-            keep_separator=True,
-        )
+        self.chunk_overlap = chunk_size - stride if stride else chunk_overlap
 
     async def extract_text_from_pdf(self, file_path: str) -> Dict[str, any]:
         """
         Extract text from PDF file with page information.
 
+        Parsing is blocking, so it runs in the default thread pool.
+
         Args:
             file_path: Path to PDF file
 
         Returns:
             Dict containing full text, pages, and metadata
         """
+        return await asyncio.to_thread(self._extract_text_from_pdf, file_path)
+
+    def _extract_text_from_pdf(self, file_path: str) -> Dict[str, any]:
+        """Blocking implementation of extract_text_from_pdf."""
         try:
             pages = []
             full_text = ""
@@ -87,12 +100,18 @@ class DocumentProcessor:
         """
         Extract text from DOCX file.
 
+        Parsing is blocking, so it runs in the default thread pool.
+
         Args:
             file_path: Path to DOCX file
 
         Returns:
             Dict containing full text and metadata
         """
+        return await asyncio.to_thread(self._extract_text_from_docx, file_path)
+
+    def _extract_text_from_docx(self, file_path: str) -> Dict[str, any]:
+        """Blocking implementation of extract_text_from_docx."""
         try:
             doc = DocxDocument(file_path)
             paragraphs = []
@@ -136,21 +155,87 @@ class DocumentProcessor:
         """
         Extract text from document (auto-detect format).
 
+        Results are memoized per (path, mtime); treat the returned dict
+        as read-only.
+
         Args:
             file_path: Path to document
 
         Returns:
             Dict containing extracted text and metadata
         """
+        try:
+            cache_key: Optional[Tuple[str, float]] = (file_path, os.path.getmtime(file_path))
+        except OSError:
+            cache_key = None
+
+        if cache_key is not None and cache_key in _extraction_cache:
+            _extraction_cache.move_to_end(cache_key)
+            logger.debug(f"Using cached extraction for {file_path}")
+            return _extraction_cache[cache_key]
+
         ext = Path(file_path).suffix.lower()
 
         if ext == '.pdf':
-            return await self.extract_text_from_pdf(file_path)
+            result = await self.extract_text_from_pdf(file_path)
         elif ext in ['.docx', '.doc']:
-            return await self.extract_text_from_docx(file_path)
+            result = await self.extract_text_from_docx(file_path)
         else:
             raise ValueError(f"Unsupported file format: {ext}")
 
+        if cache_key is not None:
+            _extraction_cache[cache_key] = result
+            if len(_extraction_cache) > _EXTRACTION_CACHE_SIZE:
+                _extraction_cache.popitem(last=False)
+
+        return result
+
+    def _chunk_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Compute (start, end) character spans for chunks in a single pass.
+
+        Chunks end on the last separator break that fits in chunk_size and the
+        next chunk starts on the first break inside the overlap window, so the
+        offsets always index into the original text.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            List of (start_char, end_char) spans
+        """
+        n = len(text)
+        breaks = [m.end() for m in _BREAK_RE.finditer(text)]
+        spans = []
+
+        start = 0
+        while start < n:
+            limit = start + self.chunk_size
+            if limit >= n:
+                end = n
+            else:
+                i = bisect_right(breaks, limit) - 1
+                end = breaks[i] if i >= 0 and breaks[i] > start else limit
+
+            # Trim surrounding whitespace by moving the offsets, not copying
+            s, e = start, end
+            while s < e and text[s].isspace():
+                s += 1
+            while e > s and text[e - 1].isspace():
+                e -= 1
+            if s < e:
+                spans.append((s, e))
+
+            if end >= n:
+                break
+
+            overlap_start = end - self.chunk_overlap
+            j = bisect_left(breaks, overlap_start)
+            next_start = breaks[j] if j < len(breaks) and breaks[j] < end else end
+            start = next_start if next_start > start else end
+
+        return spans
+
     def create_chunks(self, text: str, metadata: Dict = None) -> List[Dict]:
         """
         Split text into chunks for embedding.
@@ -162,20 +247,17 @@ class DocumentProcessor:
         Returns:
             List of chunk dictionaries
         """
-        chunks = self.text_splitter.split_text(text)
         chunk_dicts = []
 
-        current_pos = 0
-        for idx, chunk in enumerate(chunks):
+        for idx, (start, end) in enumerate(self._chunk_spans(text)):
             chunk_dict = {
                 "index": idx,
-                "content": chunk,
-                "start_char": current_pos,
-                "end_char": current_pos + len(chunk),
+                "content": text[start:end],
+                "start_char": start,
+                "end_char": end,
                 "metadata": metadata or {}
             }
             chunk_dicts.append(chunk_dict)
-            current_pos += len(chunk)
 
         logger.info(f"Created {len(chunk_dicts)} chunks from text")
         return chunk_dicts
@@ -237,6 +319,31 @@ class DocumentProcessor:
 
         return sentences
 
+    def _assign_chunk_pages(self, chunks: List[Dict], pages: List[Dict]) -> None:
+        """Set page_number on each chunk from its start offset."""
+        for chunk in chunks:
+            for page in pages:
+                if page["char_start"] <= chunk["start_char"] < page["char_end"]:
+                    chunk["page_number"] = page["page_number"]
+                    break
+
+    def _chunks_with_pages(self, extraction_result: Dict) -> List[Dict]:
+        """Chunk extracted text and tag each chunk with its page."""
+        chunks = self.create_chunks(
+            extraction_result["full_text"],
+            metadata=extraction_result.get("metadata", {})
+        )
+        if extraction_result.get("pages"):
+            self._assign_chunk_pages(chunks, extraction_result["pages"])
+        return chunks
+
+    def _sentences_with_pages(self, extraction_result: Dict) -> List[Dict]:
+        """Split extracted text into sentences mapped to their pages."""
+        sentences = self.extract_sentences(extraction_result["full_text"])
+        if extraction_result.get("pages"):
+            sentences = self.map_sentences_to_pages(sentences, extraction_result["pages"])
+        return sentences
+
     async def process_document_for_indexing(self, file_path: str) -> Dict:
         """
         Process document for indexing (chunking and embedding).
@@ -250,19 +357,8 @@ class DocumentProcessor:
         # Extract text
         extraction_result = await self.extract_text(file_path)
 
-        # Create chunks
-        chunks = self.create_chunks(
-            extraction_result["full_text"],
-            metadata=extraction_result.get("metadata", {})
-        )
-
-        # Add page information if available
-        if extraction_result.get("pages"):
-            for chunk in chunks:
-                for page in extraction_result["pages"]:
-                    if page["char_start"] <= chunk["start_char"] < page["char_end"]:
-                        chunk["page_number"] = page["page_number"]
-                        break
+        # Chunking is CPU-bound; keep it off the event loop
+        chunks = await asyncio.to_thread(self._chunks_with_pages, extraction_result)
 
         return {
             "chunks": chunks,
@@ -284,15 +380,8 @@ class DocumentProcessor:
         # Extract text
         extraction_result = await self.extract_text(file_path)
 
-        # Extract sentences
-        sentences = self.extract_sentences(extraction_result["full_text"])
-
-        # Map sentences to pages
-        if extraction_result.get("pages"):
-            sentences = self.map_sentences_to_pages(
-                sentences,
-                extraction_result["pages"]
-            )
+        # Sentence tokenization is CPU-bound; keep it off the event loop
+        sentences = await asyncio.to_thread(self._sentences_with_pages, extraction_result)
 
         return {
             "sentences": sentences,
@@ -300,3 +389,18 @@ class DocumentProcessor:
             "pages": extraction_result.get("pages", []),
             "metadata": extraction_result.get("metadata", {})
         }
+
+
+@lru_cache(maxsize=8)
+def get_document_processor(
+    chunk_size: int = 512,
+    chunk_overlap: int = 128,
+    stride: Optional[int] = None
+) -> DocumentProcessor:
+    """
+    Shared DocumentProcessor per chunking configuration.
+
+    Processors hold no per-document state, so tasks reuse one instead of
+    constructing a new one per invocation.
+    """
+    return DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap, stride=stride)
@@ -1,12 +1,89 @@
 """OpenAI embedding service using text-embedding-3-large."""
 
-from typing import List, Union
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Union
 from loguru import logger
+import openai
 from openai import AsyncOpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 import asyncio
+import base64
+import numpy as np
+import tiktoken
 
 from app.core.config import settings
+from app.core.http import http_client
+from app.core.cache import cache_key, cache_get, cache_set, cache_multi_get, cache_multi_set
+
+# Errors worth retrying; validation and auth errors fail immediately
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+@dataclass
+class NormalizedStore:
+    """
+    Contiguous float32 matrix of L2-normalized embeddings with an id index.
+
+    Cosine similarity against the store is a single matrix-vector product.
+    """
+
+    dimension: int
+    vectors: np.ndarray = None
+    ids: List[str] = field(default_factory=list)
+    index: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.vectors is None:
+            self.vectors = np.empty((0, self.dimension), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: List[str], embeddings: Union[List[List[float]], np.ndarray]) -> None:
+        """
+        Normalize and append embeddings.
+
+        Args:
+            ids: Identifier for each embedding
+            embeddings: Embedding vectors, shape (N, D)
+        """
+        matrix = np.array(embeddings, dtype=np.float32).reshape(-1, self.dimension)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+
+        offset = len(self.ids)
+        self.vectors = np.concatenate([self.vectors, matrix])
+        self.ids.extend(ids)
+        self.index.update({id_: offset + i for i, id_ in enumerate(ids)})
+
+    def get(self, id_: str) -> np.ndarray:
+        """Get the normalized vector for an id."""
+        return self.vectors[self.index[id_]]
+
+    def search(self, query: Union[List[float], np.ndarray], k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Find the k most similar stored embeddings.
+
+        Args:
+            query: Query embedding (need not be normalized)
+            k: Number of results
+
+        Returns:
+            List of (id, similarity) sorted by descending similarity
+        """
+        if not self.ids:
+            return []
+
+        sims = self.vectors @ EmbeddingService.normalize(query)
+        k = min(k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+
+        return [(self.ids[i], float(sims[i])) for i in top]
 
 
 class EmbeddingService:
@@ -14,17 +91,25 @@ class EmbeddingService:
 
     def __init__(self):
         """Initialize OpenAI client."""
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
         self.model = settings.OPENAI_EMBEDDING_MODEL
         self.dimension = settings.OPENAI_EMBEDDING_DIMENSION
         self.batch_size = settings.OPENAI_EMBEDDING_BATCH_SIZE
+        self.max_batch_tokens = settings.OPENAI_EMBEDDING_MAX_BATCH_TOKENS
+        self._semaphore = asyncio.Semaphore(settings.OPENAI_EMBEDDING_CONCURRENCY or 8)
+
+        try:
+            self._encoding = tiktoken.encoding_for_model(self.model)
+        except KeyError:
+            self._encoding = tiktoken.get_encoding("cl100k_base")
 
     @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(TRANSIENT_ERRORS),
+        stop=stop_after_attempt(5),
+        wait=wait_exponential_jitter(initial=1, max=30),
         reraise=True
     )
-    async def embed_text(self, text: str) -> List[float]:
+    async def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text.
 
@@ -32,16 +117,23 @@ class EmbeddingService:
             text: Text to embed
 
         Returns:
-            Embedding vector (3072 dimensions)
+            Float32 embedding vector (3072 dimensions)
         """
         try:
+            key = self._cache_key(text)
+            cached = await cache_get(key)
+            if cached is not None:
+                return np.asarray(cached, dtype=np.float32)
+
             response = await self.client.embeddings.create(
                 model=self.model,
                 input=text,
-                dimensions=self.dimension
+                dimensions=self.dimension,
+                encoding_format="base64"
             )
 
-            embedding = response.data[0].embedding
+            embedding = self._decode(response.data[0].embedding)
+            await cache_set(key, embedding)
             logger.debug(f"Generated embedding for text (length: {len(text)})")
             return embedding
 
@@ -50,39 +142,119 @@ class EmbeddingService:
             raise
 
     @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(TRANSIENT_ERRORS),
+        stop=stop_after_attempt(5),
+        wait=wait_exponential_jitter(initial=1, max=30),
         reraise=True
     )
-    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    async def _embed_slice(self, batch: List[str]) -> List[np.ndarray]:
         """
-        Generate embeddings for multiple texts in batch.
+        Embed one API-sized slice, bounded by the concurrency semaphore.
 
         Args:
-            texts: List of texts to embed
+            batch: Texts to embed in a single request
 
         Returns:
-            List of embedding vectors
+            Float32 embedding vectors in input order
         """
-        try:
-            # Process in batches to respect API limits
-            all_embeddings = []
+        async with self._semaphore:
+            response = await self.client.embeddings.create(
+                model=self.model,
+                input=batch,
+                dimensions=self.dimension,
+                encoding_format="base64"
+            )
+        return [self._decode(item.embedding) for item in response.data]
+
+    @staticmethod
+    def _decode(embedding: str) -> np.ndarray:
+        """
+        Decode a base64 embedding into a float32 vector.
+
+        The API sends base64 little-endian float32, which maps straight onto a
+        numpy buffer instead of being parsed into a list of Python floats.
+        """
+        return np.frombuffer(base64.b64decode(embedding), dtype="<f4").astype(np.float32, copy=False)
+
+    def _cache_key(self, text: str) -> str:
+        """Cache key for an embedding of text under the current model settings."""
+        return cache_key("embedding", self.model, self.dimension, text)
+
+    def _token_batches(self, texts: List[str]) -> List[List[str]]:
+        """
+        Greedily pack texts into request-sized batches by token count.
 
-            for i in range(0, len(texts), self.batch_size):
-                batch = texts[i:i + self.batch_size]
+        A batch is closed when adding the next text would exceed
+        OPENAI_EMBEDDING_MAX_BATCH_TOKENS or OPENAI_EMBEDDING_BATCH_SIZE inputs.
 
-                response = await self.client.embeddings.create(
-                    model=self.model,
-                    input=batch,
-                    dimensions=self.dimension
-                )
+        Args:
+            texts: Texts to pack
+
+        Returns:
+            List of batches in input order
+        """
+        token_counts = [len(tokens) for tokens in self._encoding.encode_ordinary_batch(texts)]
+
+        batches = []
+        batch: List[str] = []
+        batch_tokens = 0
+        for text, n_tokens in zip(texts, token_counts):
+            if batch and (
+                batch_tokens + n_tokens > self.max_batch_tokens
+                or len(batch) >= self.batch_size
+            ):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += n_tokens
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    async def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts in batch.
 
-                # Extract embeddings in order
-                embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(embeddings)
+        Cached embeddings are reused; the remaining texts are packed into
+        token-bounded slices which are sent concurrently, up to
+        OPENAI_EMBEDDING_CONCURRENCY requests in flight.
 
-                logger.info(f"Generated embeddings for batch {i//self.batch_size + 1} ({len(batch)} texts)")
+        Args:
+            texts: List of texts to embed
 
+        Returns:
+            Float32 matrix of shape (len(texts), dimension), one row per text
+        """
+        try:
+            keys = [self._cache_key(text) for text in texts]
+            cached = await cache_multi_get(keys)
+
+            all_embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+            misses = []
+            for i, embedding in enumerate(cached):
+                if embedding is None:
+                    misses.append(i)
+                else:
+                    all_embeddings[i] = embedding
+
+            if not misses:
+                logger.info(f"All {len(texts)} embeddings served from cache")
+                return all_embeddings
+
+            slices = self._token_batches([texts[i] for i in misses])
+            results = await asyncio.gather(*[self._embed_slice(batch) for batch in slices])
+            fresh = [embedding for result in results for embedding in result]
+
+            all_embeddings[misses] = fresh
+            await cache_multi_set({keys[i]: embedding for i, embedding in zip(misses, fresh)})
+
+            logger.info(
+                f"Generated embeddings for {len(misses)} texts in {len(slices)} batches "
+                f"({len(texts) - len(misses)} cached)"
+            )
             return all_embeddings
 
         except Exception as e:
@@ -93,7 +265,7 @@ class EmbeddingService:
         self,
         documents: List[str],
         show_progress: bool = False
-    ) -> List[List[float]]:
+    ) -> np.ndarray:
         """
         Embed multiple documents with progress tracking.
 
@@ -104,20 +276,33 @@ class EmbeddingService:
         Returns:
             List of embeddings
         """
-        embeddings = []
-        total_batches = (len(documents) + self.batch_size - 1) // self.batch_size
-
-        for i in range(0, len(documents), self.batch_size):
-            batch = documents[i:i + self.batch_size]
-            batch_embeddings = await self.embed_batch(batch)
-            embeddings.extend(batch_embeddings)
+        embeddings = await self.embed_batch(documents)
 
-            if show_progress:
-                current_batch = i // self.batch_size + 1
-                logger.info(f"Progress: {current_batch}/{total_batches} batches completed")
+        if show_progress:
+            logger.info(f"Progress: embedded {len(embeddings)}/{len(documents)} documents")
 
         return embeddings
 
+    async def embed_documents_dedup(self, documents: List[str]) -> np.ndarray:
+        """
+        Embed documents, sending each distinct text to the API only once.
+
+        Args:
+            documents: List of document texts, possibly with duplicates
+
+        Returns:
+            List of embeddings aligned with the input
+        """
+        unique: Dict[str, int] = {}
+        order = [unique.setdefault(text, len(unique)) for text in documents]
+
+        vectors = await self.embed_batch(list(unique))
+
+        if len(unique) < len(documents):
+            logger.info(f"Deduplicated {len(documents)} texts to {len(unique)} for embedding")
+
+        return vectors[order]
+
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings."""
         return self.dimension
@@ -137,15 +322,50 @@ class EmbeddingService:
         Returns:
             Cosine similarity score (0-1)
         """
-        import numpy as np
+        vec1 = np.asarray(embedding1, dtype=np.float32)
+        vec2 = np.asarray(embedding2, dtype=np.float32)
+
+        return float(vec1 @ vec2 / np.sqrt((vec1 @ vec1) * (vec2 @ vec2)))
+
+    @staticmethod
+    def normalize(vec: Union[List[float], np.ndarray]) -> np.ndarray:
+        """
+        L2-normalize an embedding as float32.
+
+        Args:
+            vec: Embedding vector
+
+        Returns:
+            Unit-length float32 vector
+        """
+        v = np.asarray(vec, dtype=np.float32)
+        return v / (np.linalg.norm(v) + 1e-12)
+
+    def compute_similarity_batch(
+        self,
+        query: List[float],
+        matrix: Union[List[List[float]], np.ndarray, NormalizedStore]
+    ) -> np.ndarray:
+        """
+        Compute cosine similarity of one query against many embeddings.
+
+        Args:
+            query: Query embedding vector
+            matrix: Candidate embeddings, shape (N, D), or a NormalizedStore
+
+        Returns:
+            Array of N similarity scores
+        """
+        q = self.normalize(query)
 
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+        # Pre-normalized stores skip the per-row norm
+        if isinstance(matrix, NormalizedStore):
+            return matrix.vectors @ q
 
-        # Cosine similarity
-        similarity = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+        m = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(m, axis=1) + 1e-12
 
-        return float(similarity)
+        return (m @ q) / norms
 
 
 # Singleton instance
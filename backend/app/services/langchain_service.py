@@ -3,16 +3,39 @@ LangChain Service for IPO Document Verification
 Uses GPT-4.1 and Gemini 2.5 Pro (2025 best models) for state-of-the-art verification
 """
 
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
+from langchain.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
 from langchain.output_parsers import PydanticOutputParser
-from langchain.chains import LLMChain
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import SystemMessage
+from langchain_core.output_parsers import StrOutputParser
 from pydantic import BaseModel, Field
-import json
+from loguru import logger
+import asyncio
+import re
+import orjson
 
 from app.core.config import settings
+from app.core.http import http_client
+from app.core.cache import cache_key, cache_get, cache_set
+
+# Outermost JSON object in LLM output that wraps it in prose or code fences
+_JSON_BLOCK_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+@lru_cache(maxsize=1024)
+def _format_evidence_cached(evidence_key: Tuple[Tuple[Any, Any, str], ...]) -> str:
+    """Format (document_name, page_number, content) tuples for the prompt."""
+    return "\n\n".join(
+        f"**Evidence {i}:**\n"
+        f"Document: {document_name}\n"
+        f"Page: {page_number}\n"
+        f"Content: {content}\n"
+        for i, (document_name, page_number, content) in enumerate(evidence_key, 1)
+    )
 
 
 class CitationModel(BaseModel):
@@ -45,7 +68,8 @@ class LangChainVerificationService:
             model=settings.OPENAI_CHAT_MODEL,  # GPT-4.1 - 1M token context
             temperature=settings.OPENAI_TEMPERATURE,
             max_tokens=settings.OPENAI_MAX_TOKENS,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            http_async_client=http_client
         )
 
         # Initialize Gemini 2.5 Pro (secondary model for cross-validation - 2025 best model)
@@ -58,11 +82,24 @@ class LangChainVerificationService:
         # Output parser for structured responses
         self.output_parser = PydanticOutputParser(pydantic_object=VerificationResult)
 
+        # Prompts and format instructions are input-independent, build them once
+        self._format_instructions = self.output_parser.get_format_instructions()
+        self._prompt = self._create_verification_prompt()
+        self._extraction_prompt = self._create_extraction_prompt()
+
+        # LCEL pipelines
+        self._gpt_chain = self._prompt | self.gpt4 | self.output_parser
+        self._gemini_chain = self._prompt | self.gemini | self.output_parser
+        self._extraction_chain = self._extraction_prompt | self.gpt4 | StrOutputParser()
+
+        # Bounds concurrent verifications to respect chat-completion rate limits
+        self._semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY or 10)
+
     def _create_verification_prompt(self) -> ChatPromptTemplate:
         """
         Create verification prompt template
         """
-        system_template = """You are an expert IPO document analyst with deep expertise in financial regulations, GAAP/IFRS standards, and legal compliance.
+        system_template = f"""You are an expert IPO document analyst with deep expertise in financial regulations, GAAP/IFRS standards, and legal compliance.
 
 Your task is to verify claims made in IPO prospectuses against supporting documentation with the highest accuracy.
 
@@ -83,7 +120,7 @@ Focus on:
 - Factual accuracy (names, locations, events)
 - Legal compliance (regulations, requirements)
 
-{format_instructions}
+{self._format_instructions}
 
 Be extremely precise with page numbers and citations."""
 
@@ -100,11 +137,46 @@ Be extremely precise with page numbers and citations."""
 
 Verify this claim and provide structured output with citations."""
 
-        system_message = SystemMessagePromptTemplate.from_template(system_template)
+        # The system message is fully static, so it is passed as a message
+        # rather than a template and skips formatting on every call
+        system_message = SystemMessage(content=system_template)
         human_message = HumanMessagePromptTemplate.from_template(human_template)
 
         return ChatPromptTemplate.from_messages([system_message, human_message])
 
+    def _create_extraction_prompt(self) -> ChatPromptTemplate:
+        """
+        Create structured content extraction prompt template
+        """
+        return ChatPromptTemplate.from_messages([
+            SystemMessage(
+                content="""You are a document analysis expert. Extract structured information from IPO documents.
+
+For each page, identify:
+1. All factual claims (financial figures, dates, metrics, assertions)
+2. Sentences that require verification
+3. Page structure and metadata
+
+Return as JSON."""
+            ),
+            HumanMessagePromptTemplate.from_template(
+                """**PAGE {page_number}:**
+
+{text}
+
+Extract all verifiable claims as a JSON array with format:
+{{
+  "claims": [
+    {{
+      "sentence": "exact sentence text",
+      "type": "financial|temporal|factual|legal",
+      "requires_verification": true/false
+    }}
+  ]
+}}"""
+            )
+        ])
+
     async def verify_claim(
         self,
         claim: str,
@@ -129,68 +201,118 @@ Verify this claim and provide structured output with citations."""
         # Format evidence for prompt
         evidence_text = self._format_evidence(supporting_evidence)
 
-        # Create prompt
-        prompt = self._create_verification_prompt()
+        # Verification is a deterministic function of the prompt inputs and models
+        key = cache_key(
+            "verification",
+            settings.OPENAI_CHAT_MODEL,
+            settings.GEMINI_MODEL if use_cross_validation else "",
+            claim,
+            claim_page,
+            evidence_text,
+            background_context
+        )
+        cached = await cache_get(key)
+        if cached is not None:
+            return cached
 
-        # Create chain with GPT-4
-        chain = LLMChain(llm=self.gpt4, prompt=prompt)
+        verification = await self._verify_claim_uncached(
+            claim, claim_page, supporting_evidence, evidence_text,
+            background_context, use_cross_validation
+        )
+        await cache_set(key, verification)
+        return verification
 
-        # Get format instructions
-        format_instructions = self.output_parser.get_format_instructions()
+    async def _verify_claim_uncached(
+        self,
+        claim: str,
+        claim_page: Optional[int],
+        supporting_evidence: List[Dict[str, Any]],
+        evidence_text: str,
+        background_context: str,
+        use_cross_validation: bool
+    ) -> VerificationResult:
+        """
+        Run GPT-4 verification with optional Gemini cross-validation
 
-        # Run verification with GPT-4
-        result = await chain.arun(
-            claim=claim,
-            claim_page=claim_page or "Unknown",
-            evidence=evidence_text,
-            background_context=background_context or "No additional context provided",
-            format_instructions=format_instructions
-        )
+        Gemini is only called once GPT-4's verdict is uncertain or low
+        confidence. With CROSS_VALIDATION_SPECULATIVE it starts alongside
+        GPT-4 instead, trading a Gemini call on every claim for latency.
+        """
+        # Speculative start: cross-validation costs max(latency) rather than
+        # the sum, but the Gemini request is sent (and billed) even when GPT-4
+        # turns out confident and it is cancelled
+        gemini_task = None
+        if use_cross_validation and settings.CROSS_VALIDATION_SPECULATIVE:
+            gemini_task = asyncio.create_task(
+                self._cross_validate_with_gemini(
+                    claim, claim_page, evidence_text, background_context
+                )
+            )
 
-        # Parse result
         try:
-            verification = self.output_parser.parse(result)
-        except Exception as e:
+            # Run verification with GPT-4
+            verification = await self._gpt_chain.ainvoke({
+                "claim": claim,
+                "claim_page": claim_page or "Unknown",
+                "evidence": evidence_text,
+                "background_context": background_context or "No additional context provided"
+            })
+        except OutputParserException as e:
             # Fallback parsing if structured output fails
-            verification = self._fallback_parse(result, supporting_evidence)
-
-        # Cross-validate with Gemini if requested
-        if use_cross_validation and verification.confidence_score < 0.9:
+            verification = self._fallback_parse(e.llm_output or "", supporting_evidence)
+        except BaseException:
+            if gemini_task:
+                gemini_task.cancel()
+            raise
+
+        if not use_cross_validation:
+            return verification
+
+        # Only genuinely uncertain or low-confidence results need a second opinion
+        needs_cv = (
+            verification.validation_result == "uncertain"
+            or verification.confidence_score < settings.CROSS_VALIDATION_CONFIDENCE_THRESHOLD
+        )
+        if not needs_cv:
+            # GPT-4 gave a clear pass/fail, release any speculative Gemini request
+            if gemini_task:
+                gemini_task.cancel()
+            return verification
+
+        # Merge results if discrepancy
+        if gemini_task:
+            gemini_result = await gemini_task
+        else:
             gemini_result = await self._cross_validate_with_gemini(
-                claim, claim_page, evidence_text, background_context, verification
+                claim, claim_page, evidence_text, background_context
             )
-            # Merge results if discrepancy
-            verification = self._merge_verifications(verification, gemini_result)
+        if gemini_result is None:
+            return verification  # Fallback to GPT-4 result
 
-        return verification
+        return self._merge_verifications(verification, gemini_result)
 
     async def _cross_validate_with_gemini(
         self,
         claim: str,
         claim_page: Optional[int],
         evidence_text: str,
-        background_context: str,
-        gpt4_result: VerificationResult
-    ) -> VerificationResult:
+        background_context: str
+    ) -> Optional[VerificationResult]:
         """
-        Cross-validate GPT-4 result with Gemini 2.5 Pro
-        """
-        prompt = self._create_verification_prompt()
-        chain = LLMChain(llm=self.gemini, prompt=prompt)
-        format_instructions = self.output_parser.get_format_instructions()
-
-        result = await chain.arun(
-            claim=claim,
-            claim_page=claim_page or "Unknown",
-            evidence=evidence_text,
-            background_context=background_context or "No additional context",
-            format_instructions=format_instructions
-        )
+        Cross-validate a claim with Gemini 2.5 Pro
 
+        Returns None if Gemini fails or its output cannot be parsed.
+        """
         try:
-            return self.output_parser.parse(result)
-        except:
-            return gpt4_result  # Fallback to GPT-4 result
+            return await self._gemini_chain.ainvoke({
+                "claim": claim,
+                "claim_page": claim_page or "Unknown",
+                "evidence": evidence_text,
+                "background_context": background_context or "No additional context"
+            })
+        except Exception as e:
+            logger.error(f"Gemini cross-validation failed: {e}")
+            return None
 
     def _merge_verifications(
         self,
@@ -208,27 +330,26 @@ Verify this claim and provide structured output with citations."""
             )
             return gpt4_result
 
-        # If they disagree, mark as uncertain and combine reasoning
-        return VerificationResult(
+        # If they disagree, mark as uncertain and combine reasoning.
+        # Both inputs are already validated models, so skip re-validation.
+        return VerificationResult.model_construct(
             validation_result="uncertain",
             confidence_score=0.5,
             reasoning=f"**GPT-4 Analysis:** {gpt4_result.reasoning}\n\n**Gemini Analysis:** {gemini_result.reasoning}\n\n**Note:** Models disagree - manual review recommended.",
-            citations=gpt4_result.citations + gemini_result.citations
+            citations=[*gpt4_result.citations, *gemini_result.citations]
         )
 
     def _format_evidence(self, evidence: List[Dict[str, Any]]) -> str:
         """
         Format evidence chunks for prompt
+
+        Claims that share evidence reuse the memoized formatting.
         """
-        formatted = []
-        for i, chunk in enumerate(evidence, 1):
-            formatted.append(
-                f"**Evidence {i}:**\n"
-                f"Document: {chunk.get('document_name', 'Unknown')}\n"
-                f"Page: {chunk.get('page_number', 'Unknown')}\n"
-                f"Content: {chunk.get('content', '')}\n"
-            )
-        return "\n\n".join(formatted)
+        evidence_key = tuple(
+            (chunk.get('document_name', 'Unknown'), chunk.get('page_number', 'Unknown'), chunk.get('content', ''))
+            for chunk in evidence
+        )
+        return _format_evidence_cached(evidence_key)
 
     def _fallback_parse(
         self,
@@ -278,41 +399,20 @@ Verify this claim and provide structured output with citations."""
         """
         Extract structured content from a document page using GPT-4
         """
-        prompt = ChatPromptTemplate.from_messages([
-            SystemMessagePromptTemplate.from_template(
-                """You are a document analysis expert. Extract structured information from IPO documents.
-
-For each page, identify:
-1. All factual claims (financial figures, dates, metrics, assertions)
-2. Sentences that require verification
-3. Page structure and metadata
-
-Return as JSON."""
-            ),
-            HumanMessagePromptTemplate.from_template(
-                """**PAGE {page_number}:**
-
-{text}
-
-Extract all verifiable claims as a JSON array with format:
-{{
-  "claims": [
-    {{
-      "sentence": "exact sentence text",
-      "type": "financial|temporal|factual|legal",
-      "requires_verification": true/false
-    }}
-  ]
-}}"""
-            )
-        ])
-
-        chain = LLMChain(llm=self.gpt4, prompt=prompt)
-        result = await chain.arun(page_number=page_number, text=document_text)
+        result = await self._extraction_chain.ainvoke({
+            "page_number": page_number,
+            "text": document_text
+        })
 
         try:
-            return json.loads(result)
-        except:
+            return orjson.loads(result)
+        except orjson.JSONDecodeError:
+            match = _JSON_BLOCK_RE.search(result)
+            if match:
+                try:
+                    return orjson.loads(match.group(0))
+                except orjson.JSONDecodeError:
+                    pass
             return {"claims": [], "raw": result}
 
     async def batch_verify_claims(
@@ -322,23 +422,37 @@ Extract all verifiable claims as a JSON array with format:
         background_context: str = ""
     ) -> List[VerificationResult]:
         """
-        Batch verify multiple claims efficiently
+        Batch verify multiple claims concurrently
+
+        Claims are verified in parallel up to LLM_MAX_CONCURRENCY at a time.
+        A claim that exceeds LLM_CALL_TIMEOUT is returned as uncertain.
+        Results preserve the order of the input claims.
         """
-        results = []
-        for claim_data in claims:
+        async def _verify(claim_data: Dict[str, Any]) -> VerificationResult:
             claim_text = claim_data.get("sentence", "")
             claim_page = claim_data.get("page", None)
 
             # Get relevant evidence for this claim
             evidence = evidence_store.get(claim_text, [])
 
-            # Verify claim
-            result = await self.verify_claim(
-                claim=claim_text,
-                claim_page=claim_page,
-                supporting_evidence=evidence,
-                background_context=background_context
-            )
-            results.append(result)
-
-        return results
+            async with self._semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.verify_claim(
+                            claim=claim_text,
+                            claim_page=claim_page,
+                            supporting_evidence=evidence,
+                            background_context=background_context
+                        ),
+                        timeout=settings.LLM_CALL_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    logger.error(f"Verification timed out for claim: {claim_text[:100]}")
+                    return VerificationResult(
+                        validation_result="uncertain",
+                        confidence_score=0.0,
+                        reasoning="Verification timed out - manual review recommended.",
+                        citations=[]
+                    )
+
+        return await asyncio.gather(*[_verify(claim_data) for claim_data in claims])
@@ -4,15 +4,159 @@ Mistral AI provides superior document understanding and reasoning capabilities,
 making it ideal for extracting structured information and citations from PDFs.
 """
 
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, List, Dict, Optional, Any
 from loguru import logger
-from mistralai.client import MistralClient
+from mistralai.async_client import MistralAsyncClient
 from mistralai.models.chat_completion import ChatMessage
 from tenacity import retry, stop_after_attempt, wait_exponential
-import json
+import asyncio
+import io
 import re
+from string import Template
+
+import orjson
 
 from app.core.config import settings
+from app.core.cache import cache_key, cache_get, cache_set
+
+
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+
+def _schema_object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Strict JSON schema object requiring every listed property."""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False
+    }
+
+
+def _schema_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Mistral response_format for a strict JSON schema."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "schema": schema, "strict": True}
+    }
+
+
+_STRING = {"type": "string"}
+_INTEGER = {"type": "integer"}
+_NUMBER = {"type": "number"}
+
+PAGE_EXTRACTION_SCHEMA = _schema_object({
+    "page_number": _INTEGER,
+    "sections": {"type": "array", "items": _schema_object({
+        "heading": _STRING,
+        "content": _STRING,
+        "start_char": _INTEGER,
+        "end_char": _INTEGER,
+        "type": {"type": "string", "enum": ["paragraph", "heading", "table", "list"]}
+    })},
+    "citations": {"type": "array", "items": _schema_object({
+        "text": _STRING,
+        "reference": _STRING,
+        "page_number": _INTEGER,
+        "position": _STRING
+    })},
+    "tables": {"type": "array", "items": _schema_object({
+        "title": _STRING,
+        "data": _STRING,
+        "page_number": _INTEGER
+    })},
+    "key_facts": {"type": "array", "items": _schema_object({
+        "fact": _STRING,
+        "page_number": _INTEGER,
+        "context": _STRING
+    })}
+})
+
+CITATIONS_SCHEMA = _schema_object({
+    "citations": {"type": "array", "items": _schema_object({
+        "cited_text": _STRING,
+        "page_number": _INTEGER,
+        "reference_type": {"type": "string", "enum": [
+            "financial_data", "legal_reference", "external_source", "internal_cross_reference"
+        ]},
+        "context_before": _STRING,
+        "context_after": _STRING,
+        "confidence": _NUMBER,
+        "notes": _STRING
+    })}
+})
+
+VERIFICATION_SCHEMA = _schema_object({
+    "validation_result": {"type": "string", "enum": ["VALIDATED", "UNCERTAIN", "INCORRECT"]},
+    "confidence_score": _NUMBER,
+    "reasoning": _STRING,
+    "citations": {"type": "array", "items": _schema_object({
+        "source_page": {"type": ["integer", "null"]},
+        "cited_text": _STRING,
+        "relevance": _STRING,
+        "similarity_score": _NUMBER,
+        "context_before": _STRING,
+        "context_after": _STRING
+    })},
+    "key_findings": {"type": "array", "items": _STRING}
+})
+
+
+# User prompt templates, built once; per call only the placeholders are filled
+_EXTRACTION_USER_TMPL = Template("""Extract structured information from this IPO document page.
+
+**Page Number**: $page_number
+**Document Context**: $doc_title
+
+**Page Content**:
+```
+$page_text
+```""")
+
+_CITATION_USER_TMPL = Template("""Extract ALL citations and references from this page with EXACT details.
+
+**Page Number**: $page_number
+
+**Content**:
+```
+$page_text
+```
+
+If no citations found, return an empty "citations" array.""")
+
+_VERIFICATION_USER_TMPL = Template("""Verify this claim from an IPO document with PRECISION.
+
+**Claim** (Page $claim_page):
+"$claim"
+
+**Background Context**:
+$background_context
+
+**Supporting Evidence from Source Documents**:
+$evidence_text
+
+**Your Task**:
+1. Analyze the claim carefully
+2. Review ALL evidence provided
+3. Determine: VALIDATED, UNCERTAIN, or INCORRECT
+4. Provide EXACT citations with page numbers
+5. Explain your reasoning
+
+**Critical**: Always include exact page numbers and quotes!""")
+
+# Page references in free-text model output, e.g. "Page 12" or "p. 12"
+_PAGE_RE = re.compile(r"\b(?:page|p\.)\s*(\d+)", re.IGNORECASE)
+
+
+def _parse_page(value: Any) -> Any:
+    """Coerce a page reference to an int when possible, else return it unchanged."""
+    if isinstance(value, int) or value is None:
+        return value
+    text = str(value).strip()
+    if text.isdigit():
+        return int(text)
+    match = _PAGE_RE.search(text)
+    return int(match.group(1)) if match else value
 
 
 class MistralService:
@@ -20,11 +164,100 @@ class MistralService:
 
     def __init__(self):
         """Initialize Mistral client."""
-        self.client = MistralClient(api_key=settings.MISTRAL_API_KEY)
+        # The SDK keeps its own HTTP pool, with transport retries and its
+        # longer timeout
+        self.async_client = MistralAsyncClient(api_key=settings.MISTRAL_API_KEY)
         self.model = settings.MISTRAL_MODEL
         self.temperature = settings.MISTRAL_TEMPERATURE
         self.max_tokens = settings.MISTRAL_MAX_TOKENS
 
+        # Bounds concurrent chat calls so callers can gather over many pages
+        self._semaphore = asyncio.Semaphore(settings.MISTRAL_MAX_CONCURRENCY)
+
+    def _cache_key(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Result cache key for a chat request."""
+        format_name = (response_format or JSON_OBJECT_FORMAT).get("json_schema", {}).get("name", "json_object")
+        return cache_key(
+            "mistral", self.model, self.temperature, max_tokens, format_name,
+            *[message.content for message in messages]
+        )
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        reraise=True
+    )
+    async def _chat(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Send a JSON-mode chat request, bounded by the concurrency semaphore.
+
+        The response is streamed and assembled; identical requests are served
+        from the exact-match result cache.
+
+        Args:
+            messages: Chat messages
+            max_tokens: Override for the configured max tokens
+            response_format: JSON schema format; plain JSON mode if omitted
+
+        Returns:
+            Content of the first completion choice
+        """
+        max_tokens = max_tokens or self.max_tokens
+        key = self._cache_key(messages, max_tokens, response_format)
+        cached = await cache_get(key)
+        if cached is not None:
+            return cached
+
+        content = "".join([
+            delta async for delta in self._chat_stream(messages, max_tokens, response_format)
+        ])
+        await cache_set(key, content)
+        return content
+
+    async def _chat_stream(
+        self,
+        messages: List[ChatMessage],
+        max_tokens: int,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a JSON-mode chat completion, yielding content deltas as they arrive.
+
+        Args:
+            messages: Chat messages
+            max_tokens: Max tokens for the completion
+            response_format: JSON schema format; plain JSON mode if omitted
+
+        Yields:
+            Content deltas in order
+        """
+        async with self._semaphore:
+            async for chunk in self.async_client.chat_stream(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                response_format=response_format or JSON_OBJECT_FORMAT
+            ):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    # RESPONSE SCHEMAS (sent as response_format instead of inline in each prompt)
+
+    EXTRACTION_FORMAT = _schema_format("page_extraction", PAGE_EXTRACTION_SCHEMA)
+    CITATIONS_FORMAT = _schema_format("page_citations", CITATIONS_SCHEMA)
+    VERIFICATION_FORMAT = _schema_format("claim_verification", VERIFICATION_SCHEMA)
+
     # PROMPT TEMPLATES FOR DOCUMENT EXTRACTION
 
     EXTRACTION_SYSTEM_PROMPT = """You are an expert document analyst specializing in extracting structured information from financial and legal documents, particularly IPO prospectuses.
@@ -43,6 +276,28 @@ Return structured JSON with:
 
 Be meticulous about accuracy - this will be used for legal verification."""
 
+    EXTRACTION_SYSTEM_PROMPT_IPO = """You extract structured information from IPO prospectus pages for legal verification.
+Preserve headings, lists, tables, footnotes and cross-references exactly, with page numbers and character positions.
+Prioritize offering terms, financial figures, risk factors, use of proceeds and management disclosures."""
+
+    EXTRACTION_SYSTEM_PROMPT_ANNUAL_REPORT = """You extract structured information from annual report pages.
+Preserve headings, lists, tables and footnotes exactly, with page numbers and character positions.
+Prioritize financial results, segment data, guidance and governance disclosures."""
+
+    EXTRACTION_SYSTEM_PROMPT_FINANCIAL = """You extract structured information from financial statement pages.
+Reproduce tables, line items, periods, units and notes exactly, with page numbers and character positions."""
+
+    # Extraction system prompt by document_type from analyze_document_structure
+    SYSTEM_PROMPTS = {
+        "IPO Prospectus": EXTRACTION_SYSTEM_PROMPT_IPO,
+        "Annual Report": EXTRACTION_SYSTEM_PROMPT_ANNUAL_REPORT,
+        "Financial Statement": EXTRACTION_SYSTEM_PROMPT_FINANCIAL,
+    }
+
+    def _extraction_system_message(self, document_type: Optional[str]) -> ChatMessage:
+        """Pick the extraction system message for a document type, or the generic one."""
+        return _SYS_EXTRACTION_BY_TYPE.get(document_type, _SYS_EXTRACTION)
+
     CITATION_EXTRACTION_PROMPT = """You are a citation extraction specialist for legal and financial documents.
 
 Given a document page, extract ALL citations, references, and supporting evidence with EXACT page numbers and positions.
@@ -74,16 +329,31 @@ Classification rules:
 
 ALWAYS cite exact page numbers and quote the supporting text."""
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True
-    )
+    def _extraction_messages(
+        self,
+        page_text: str,
+        page_number: int,
+        document_metadata: Optional[Dict] = None,
+        document_type: Optional[str] = None
+    ) -> List[ChatMessage]:
+        """Build the structured extraction messages for one page."""
+        user_prompt = _EXTRACTION_USER_TMPL.substitute(
+            page_number=page_number,
+            doc_title=document_metadata.get('title', 'IPO Document') if document_metadata else 'IPO Document',
+            page_text=page_text
+        )
+
+        return [
+            self._extraction_system_message(document_type),
+            ChatMessage(role="user", content=user_prompt)
+        ]
+
     async def extract_structured_content(
         self,
         page_text: str,
         page_number: int,
-        document_metadata: Optional[Dict] = None
+        document_metadata: Optional[Dict] = None,
+        document_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Extract structured content from a PDF page using Mistral.
@@ -92,71 +362,16 @@ ALWAYS cite exact page numbers and quote the supporting text."""
             page_text: Text content from the page
             page_number: Page number
             document_metadata: Optional metadata about the document
+            document_type: Document type from analyze_document_structure, used
+                to pick a shorter specialized system prompt
 
         Returns:
             Structured extraction with citations and metadata
         """
         try:
-            user_prompt = f"""Extract structured information from this IPO document page.
-
-**Page Number**: {page_number}
-**Document Context**: {document_metadata.get('title', 'IPO Document') if document_metadata else 'IPO Document'}
-
-**Page Content**:
-```
-{page_text}
-```
-
-Extract and return JSON with:
-{{
-    "page_number": {page_number},
-    "sections": [
-        {{
-            "heading": "Section title",
-            "content": "Section text",
-            "start_char": 0,
-            "end_char": 100,
-            "type": "paragraph|heading|table|list"
-        }}
-    ],
-    "citations": [
-        {{
-            "text": "Exact citation text",
-            "reference": "What it references",
-            "page_number": {page_number},
-            "position": "approximate position in text"
-        }}
-    ],
-    "tables": [
-        {{
-            "title": "Table title",
-            "data": "Structured table data",
-            "page_number": {page_number}
-        }}
-    ],
-    "key_facts": [
-        {{
-            "fact": "Important fact or figure",
-            "page_number": {page_number},
-            "context": "Surrounding context"
-        }}
-    ]
-}}"""
-
-            messages = [
-                ChatMessage(role="system", content=self.EXTRACTION_SYSTEM_PROMPT),
-                ChatMessage(role="user", content=user_prompt)
-            ]
+            messages = self._extraction_messages(page_text, page_number, document_metadata, document_type)
 
-            response = self.client.chat(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                response_format={"type": "json_object"}
-            )
-
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(await self._chat(messages, response_format=self.EXTRACTION_FORMAT))
             logger.info(f"Extracted structured content from page {page_number}")
             return result
 
@@ -170,11 +385,15 @@ Extract and return JSON with:
                 "key_facts": []
             }
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True
-    )
+    def _citation_messages(self, page_text: str, page_number: int) -> List[ChatMessage]:
+        """Build the citation extraction messages for one page."""
+        user_prompt = _CITATION_USER_TMPL.substitute(page_number=page_number, page_text=page_text)
+
+        return [
+            _SYS_CITATION,
+            ChatMessage(role="user", content=user_prompt)
+        ]
+
     async def extract_citations_from_page(
         self,
         page_text: str,
@@ -191,44 +410,9 @@ Extract and return JSON with:
             List of citations with exact positions
         """
         try:
-            user_prompt = f"""Extract ALL citations and references from this page with EXACT details.
-
-**Page Number**: {page_number}
-
-**Content**:
-```
-{page_text}
-```
-
-Return JSON array of citations:
-[
-    {{
-        "cited_text": "Exact text being cited or referenced",
-        "page_number": {page_number},
-        "reference_type": "financial_data|legal_reference|external_source|internal_cross_reference",
-        "context_before": "Text before citation",
-        "context_after": "Text after citation",
-        "confidence": 0.0-1.0,
-        "notes": "Any relevant notes about this citation"
-    }}
-]
-
-If no citations found, return empty array."""
+            messages = self._citation_messages(page_text, page_number)
 
-            messages = [
-                ChatMessage(role="system", content=self.CITATION_EXTRACTION_PROMPT),
-                ChatMessage(role="user", content=user_prompt)
-            ]
-
-            response = self.client.chat(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                response_format={"type": "json_object"}
-            )
-
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(await self._chat(messages, response_format=self.CITATIONS_FORMAT))
             citations = result.get("citations", [])
 
             logger.info(f"Extracted {len(citations)} citations from page {page_number}")
@@ -238,11 +422,6 @@ If no citations found, return empty array."""
             logger.error(f"Error extracting citations: {e}")
             return []
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True
-    )
     async def verify_claim_with_citations(
         self,
         claim: str,
@@ -266,65 +445,25 @@ If no citations found, return empty array."""
             # Format evidence with page numbers
             evidence_text = self._format_evidence_with_pages(supporting_evidence)
 
-            user_prompt = f"""Verify this claim from an IPO document with PRECISION.
-
-**Claim** (Page {claim_page if claim_page else 'Unknown'}):
-"{claim}"
-
-**Background Context**:
-{background_context if background_context else 'IPO document verification'}
-
-**Supporting Evidence from Source Documents**:
-{evidence_text}
-
-**Your Task**:
-1. Analyze the claim carefully
-2. Review ALL evidence provided
-3. Determine: VALIDATED, UNCERTAIN, or INCORRECT
-4. Provide EXACT citations with page numbers
-5. Explain your reasoning
-
-**Response Format (JSON)**:
-{{
-    "validation_result": "VALIDATED|UNCERTAIN|INCORRECT",
-    "confidence_score": 0.0-1.0,
-    "reasoning": "Detailed explanation of your assessment",
-    "citations": [
-        {{
-            "source_page": "page number from evidence",
-            "cited_text": "EXACT quote from source document",
-            "relevance": "How this supports or contradicts the claim",
-            "similarity_score": 0.0-1.0,
-            "context_before": "Text before the quote",
-            "context_after": "Text after the quote"
-        }}
-    ],
-    "key_findings": [
-        "Important findings from your analysis"
-    ]
-}}
-
-**Critical**: Always include exact page numbers and quotes!"""
+            user_prompt = _VERIFICATION_USER_TMPL.substitute(
+                claim_page=claim_page if claim_page else 'Unknown',
+                claim=claim,
+                background_context=background_context if background_context else 'IPO document verification',
+                evidence_text=evidence_text
+            )
 
             messages = [
-                ChatMessage(role="system", content=self.VERIFICATION_SYSTEM_PROMPT),
+                _SYS_VERIFY,
                 ChatMessage(role="user", content=user_prompt)
             ]
 
-            response = self.client.chat(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                response_format={"type": "json_object"}
-            )
-
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(await self._chat(messages, response_format=self.VERIFICATION_FORMAT))
 
             # Ensure citations have all required fields
             citations = result.get("citations", [])
             for citation in citations:
-                citation["page_number"] = citation.get("source_page", "Unknown")
+                page = _parse_page(citation.get("source_page"))
+                citation["page_number"] = page if page is not None else "Unknown"
                 if "similarity_score" not in citation:
                     citation["similarity_score"] = 0.85  # Default high confidence
 
@@ -345,27 +484,30 @@ If no citations found, return empty array."""
                 "key_findings": []
             }
 
+    EVIDENCE_TEMPLATE = (
+        "**Evidence {idx}** (Similarity: {similarity:.2%})\n"
+        "📄 Source: {filename}\n"
+        "📖 Page: {page_number}\n\n"
+        "{content}\n\n"
+        "---"
+    )
+
     def _format_evidence_with_pages(self, evidence: List[Dict[str, Any]]) -> str:
         """Format evidence chunks with page numbers for the prompt."""
-        formatted = []
+        buffer = io.StringIO()
 
         for idx, chunk in enumerate(evidence, 1):
-            page_num = chunk.get("page_number", "Unknown")
-            filename = chunk.get("filename", "Document")
-            content = chunk.get("content", "")
-            similarity = chunk.get("similarity", 0.0)
-
-            formatted.append(
-                f"""**Evidence {idx}** (Similarity: {similarity:.2%})
-📄 Source: {filename}
-📖 Page: {page_num}
-
-{content}
-
----"""
-            )
-
-        return "\n\n".join(formatted)
+            if idx > 1:
+                buffer.write("\n\n")
+            buffer.write(self.EVIDENCE_TEMPLATE.format(
+                idx=idx,
+                similarity=chunk.get("similarity", 0.0),
+                filename=chunk.get("filename", "Document"),
+                page_number=chunk.get("page_number", "Unknown"),
+                content=chunk.get("content", "")
+            ))
+
+        return buffer.getvalue()
 
     async def analyze_document_structure(
         self,
@@ -416,19 +558,11 @@ Identify and return JSON:
 }}"""
 
             messages = [
-                ChatMessage(role="system", content=self.EXTRACTION_SYSTEM_PROMPT),
+                _SYS_EXTRACTION,
                 ChatMessage(role="user", content=user_prompt)
             ]
 
-            response = self.client.chat(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=4096,
-                response_format={"type": "json_object"}
-            )
-
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(await self._chat(messages, max_tokens=4096))
             logger.info("Analyzed document structure")
             return result
 
@@ -442,5 +576,14 @@ Identify and return JSON:
             }
 
 
+# Fixed system messages, validated once and shared by every request
+_SYS_EXTRACTION = ChatMessage(role="system", content=MistralService.EXTRACTION_SYSTEM_PROMPT)
+_SYS_EXTRACTION_BY_TYPE = {
+    document_type: ChatMessage(role="system", content=prompt)
+    for document_type, prompt in MistralService.SYSTEM_PROMPTS.items()
+}
+_SYS_CITATION = ChatMessage(role="system", content=MistralService.CITATION_EXTRACTION_PROMPT)
+_SYS_VERIFY = ChatMessage(role="system", content=MistralService.VERIFICATION_SYSTEM_PROMPT)
+
 # Singleton instance
 mistral_service = MistralService()
@@ -1,19 +1,87 @@
 """Supabase Storage service for S3-compatible file storage."""
 
-from typing import BinaryIO, Optional
+from typing import BinaryIO, ClassVar, List, Optional, Set, Tuple
 from pathlib import Path
 from uuid import UUID
+import asyncio
 import mimetypes
+import aioboto3
+from aiolimiter import AsyncLimiter
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import (
+    ClientError, ConnectionClosedError, ConnectTimeoutError,
+    EndpointConnectionError, ReadTimeoutError
+)
+from cachetools import LRUCache, TLRUCache, TTLCache
 from loguru import logger
 from supabase import create_client, Client
 from storage3.utils import StorageException
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 
 from app.core.config import settings
 
+# Object metadata by storage path, so repeated lookups skip the round-trip
+_file_info_cache: TTLCache = TTLCache(maxsize=1024, ttl=settings.STORAGE_INFO_CACHE_TTL)
+
+# Signed URLs expire a minute before the URL itself so callers never get a
+# stale one; public URLs are a pure function of the path
+SIGNED_URL_EXPIRY_MARGIN = 60
+_signed_url_cache: TLRUCache = TLRUCache(
+    maxsize=10_000,
+    ttu=lambda key, url, now: now + max(key[1] - SIGNED_URL_EXPIRY_MARGIN, 0)
+)
+_public_url_cache: LRUCache = LRUCache(maxsize=10_000)
+
+# Client-side throttle so bulk fan-out stays under the storage rate limit
+_rate_limiter = AsyncLimiter(settings.STORAGE_REQUESTS_PER_MINUTE, 60)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (
+    StorageException,
+    EndpointConnectionError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    ReadTimeoutError,
+    asyncio.TimeoutError,
+)
+
+_backoff = wait_exponential_jitter(initial=0.5, max=30)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a storage error is worth retrying (throttling, 5xx, network)."""
+    if isinstance(exc, ClientError):
+        status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        return status in RETRYABLE_STATUS_CODES
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+
+def _wait_retry_after(retry_state) -> float:
+    """Honor a Retry-After header when throttled, otherwise back off with jitter."""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, ClientError):
+        headers = exc.response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+        try:
+            return min(float(headers["retry-after"]), 60.0)
+        except (KeyError, ValueError):
+            pass
+    return _backoff(retry_state)
+
+
+storage_retry = retry(
+    retry=retry_if_exception(_is_transient),
+    stop=stop_after_attempt(5),
+    wait=_wait_retry_after,
+    reraise=True
+)
+
 
 class StorageService:
     """Service for managing document storage using Supabase Storage (S3-compatible)."""
 
+    # Buckets already verified in this process; the check is a network round-trip
+    _bucket_checked: ClassVar[Set[str]] = set()
+
     def __init__(self):
         """Initialize Supabase client and storage bucket."""
         self.client: Client = create_client(
@@ -21,10 +89,35 @@ class StorageService:
             settings.SUPABASE_SERVICE_KEY or settings.SUPABASE_KEY
         )
         self.bucket_name = settings.SUPABASE_STORAGE_BUCKET
+
+        # Object reads and writes go through the S3-compatible endpoint so
+        # they can run concurrently without blocking the event loop
+        self._session = aioboto3.Session()
+        self._s3_config = {
+            "endpoint_url": f"{settings.SUPABASE_URL}/storage/v1/s3",
+            "region_name": settings.SUPABASE_S3_REGION,
+            "aws_access_key_id": settings.SUPABASE_S3_ACCESS_KEY_ID,
+            "aws_secret_access_key": settings.SUPABASE_S3_SECRET_ACCESS_KEY,
+        }
+
+        # Large files are streamed in fixed-size parts, uploaded concurrently
+        self._transfer_config = TransferConfig(
+            multipart_threshold=settings.STORAGE_MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=settings.STORAGE_MULTIPART_CHUNK_SIZE,
+            max_concurrency=settings.STORAGE_MULTIPART_CONCURRENCY,
+        )
+
         self._ensure_bucket_exists()
 
+    def _s3(self):
+        """Open an async S3 client for the Supabase storage endpoint."""
+        return self._session.client("s3", **self._s3_config)
+
     def _ensure_bucket_exists(self):
-        """Create storage bucket if it doesn't exist."""
+        """Create storage bucket if it doesn't exist (once per bucket per process)."""
+        if settings.SKIP_BUCKET_CHECK or self.bucket_name in self._bucket_checked:
+            return
+
         try:
             # Try to get bucket info
             self.client.storage.get_bucket(self.bucket_name)
@@ -49,7 +142,10 @@ class StorageService:
                 logger.error(f"Error creating storage bucket: {e}")
                 raise
 
-    def upload_file(
+        self._bucket_checked.add(self.bucket_name)
+
+    @storage_retry
+    async def upload_file(
         self,
         file: BinaryIO,
         filename: str,
@@ -78,20 +174,25 @@ class StorageService:
                 if not content_type:
                     content_type = "application/octet-stream"
 
-            # Read file data
-            file_data = file.read()
-
-            # Upload to Supabase Storage
-            response = self.client.storage.from_(self.bucket_name).upload(
-                path=storage_path,
-                file=file_data,
-                file_options={
-                    "content-type": content_type,
-                    "cache-control": "3600",
-                    "upsert": "false"
-                }
-            )
+            # Rewind in case this is a retry of a partially sent upload
+            if file.seekable():
+                file.seek(0)
 
+            # Stream to Supabase Storage; files above the threshold go up as a
+            # multipart upload without being read into memory first
+            async with _rate_limiter, self._s3() as s3:
+                await s3.upload_fileobj(
+                    file,
+                    self.bucket_name,
+                    storage_path,
+                    ExtraArgs={
+                        "ContentType": content_type,
+                        "CacheControl": "max-age=3600"
+                    },
+                    Config=self._transfer_config
+                )
+
+            _file_info_cache.pop(storage_path, None)
             logger.info(f"Uploaded file to storage: {storage_path}")
             return storage_path
 
@@ -99,7 +200,28 @@ class StorageService:
             logger.error(f"Error uploading file to storage: {e}")
             raise
 
-    def download_file(self, storage_path: str) -> bytes:
+    async def upload_files(
+        self,
+        files: List[Tuple[BinaryIO, str, Optional[str]]],
+        project_id: UUID
+    ) -> List[str]:
+        """
+        Upload several files concurrently.
+
+        Args:
+            files: (file, filename, content_type) tuples
+            project_id: Project UUID for organization
+
+        Returns:
+            Storage paths in input order
+        """
+        return await asyncio.gather(*[
+            self.upload_file(file, filename, project_id, content_type)
+            for file, filename, content_type in files
+        ])
+
+    @storage_retry
+    async def download_file(self, storage_path: str) -> bytes:
         """
         Download file from Supabase Storage.
 
@@ -110,9 +232,13 @@ class StorageService:
             File content as bytes
         """
         try:
-            response = self.client.storage.from_(self.bucket_name).download(storage_path)
+            async with _rate_limiter, self._s3() as s3:
+                response = await s3.get_object(Bucket=self.bucket_name, Key=storage_path)
+                async with response["Body"] as stream:
+                    data = await stream.read()
+
             logger.info(f"Downloaded file from storage: {storage_path}")
-            return response
+            return data
 
         except Exception as e:
             logger.error(f"Error downloading file from storage: {e}")
@@ -128,8 +254,13 @@ class StorageService:
         Returns:
             Public URL
         """
+        url = _public_url_cache.get(storage_path)
+        if url is not None:
+            return url
+
         try:
             url = self.client.storage.from_(self.bucket_name).get_public_url(storage_path)
+            _public_url_cache[storage_path] = url
             return url
 
         except Exception as e:
@@ -147,18 +278,26 @@ class StorageService:
         Returns:
             Signed URL
         """
+        key = (storage_path, expires_in)
+        url = _signed_url_cache.get(key)
+        if url is not None:
+            return url
+
         try:
             response = self.client.storage.from_(self.bucket_name).create_signed_url(
                 storage_path,
                 expires_in
             )
-            return response['signedURL']
+            url = response['signedURL']
+            _signed_url_cache[key] = url
+            return url
 
         except Exception as e:
             logger.error(f"Error creating signed URL: {e}")
             raise
 
-    def delete_file(self, storage_path: str):
+    @storage_retry
+    async def delete_file(self, storage_path: str):
         """
         Delete file from Supabase Storage.
 
@@ -166,14 +305,17 @@ class StorageService:
             storage_path: Path to file in storage
         """
         try:
-            self.client.storage.from_(self.bucket_name).remove([storage_path])
+            async with _rate_limiter, self._s3() as s3:
+                await s3.delete_object(Bucket=self.bucket_name, Key=storage_path)
+            _file_info_cache.pop(storage_path, None)
             logger.info(f"Deleted file from storage: {storage_path}")
 
         except Exception as e:
             logger.error(f"Error deleting file from storage: {e}")
             raise
 
-    def delete_project_files(self, project_id: UUID):
+    @storage_retry
+    async def delete_project_files(self, project_id: UUID):
         """
         Delete all files for a project.
 
@@ -181,21 +323,35 @@ class StorageService:
             project_id: Project UUID
         """
         try:
-            # List all files in project folder
-            project_path = f"projects/{str(project_id)}"
-            files = self.client.storage.from_(self.bucket_name).list(project_path)
-
-            # Delete all files
-            if files:
-                file_paths = [f"{project_path}/{f['name']}" for f in files]
-                self.client.storage.from_(self.bucket_name).remove(file_paths)
-                logger.info(f"Deleted all files for project {project_id}")
+            project_path = f"projects/{str(project_id)}/"
+            deleted = 0
+
+            async with self._s3() as s3:
+                # Prefix listing is recursive, so nested folders are included;
+                # each page holds at most 1000 keys, the delete_objects limit
+                paginator = s3.get_paginator("list_objects_v2")
+                async for page in paginator.paginate(Bucket=self.bucket_name, Prefix=project_path):
+                    keys = [obj["Key"] for obj in page.get("Contents", [])]
+                    if not keys:
+                        continue
+
+                    async with _rate_limiter:
+                        await s3.delete_objects(
+                            Bucket=self.bucket_name,
+                            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
+                        )
+                    for key in keys:
+                        _file_info_cache.pop(key, None)
+                    deleted += len(keys)
+
+            if deleted:
+                logger.info(f"Deleted {deleted} files for project {project_id}")
 
         except Exception as e:
             logger.error(f"Error deleting project files: {e}")
             raise
 
-    def list_project_files(self, project_id: UUID) -> list:
+    async def list_project_files(self, project_id: UUID) -> list:
         """
         List all files for a project.
 
@@ -206,15 +362,29 @@ class StorageService:
             List of file metadata
         """
         try:
-            project_path = f"projects/{str(project_id)}"
-            files = self.client.storage.from_(self.bucket_name).list(project_path)
+            project_path = f"projects/{str(project_id)}/"
+
+            files = []
+            async with self._s3() as s3:
+                paginator = s3.get_paginator("list_objects_v2")
+                async for page in paginator.paginate(Bucket=self.bucket_name, Prefix=project_path):
+                    files.extend(
+                        {
+                            "name": obj["Key"][len(project_path):],
+                            "size": obj["Size"],
+                            "last_modified": obj["LastModified"],
+                            "etag": obj["ETag"].strip('"')
+                        }
+                        for obj in page.get("Contents", [])
+                    )
+
             return files
 
         except Exception as e:
             logger.error(f"Error listing project files: {e}")
             raise
 
-    def get_file_info(self, storage_path: str) -> dict:
+    async def get_file_info(self, storage_path: str) -> dict:
         """
         Get file metadata.
 
@@ -224,21 +394,28 @@ class StorageService:
         Returns:
             File metadata
         """
-        try:
-            # Extract folder and filename
-            parts = storage_path.rsplit('/', 1)
-            folder = parts[0] if len(parts) > 1 else ''
-            filename = parts[-1]
-
-            # List files in folder
-            files = self.client.storage.from_(self.bucket_name).list(folder)
+        cached = _file_info_cache.get(storage_path)
+        if cached is not None:
+            return cached
 
-            # Find matching file
-            for file in files:
-                if file['name'] == filename:
-                    return file
-
-            raise FileNotFoundError(f"File not found: {storage_path}")
+        try:
+            async with self._s3() as s3:
+                try:
+                    response = await s3.head_object(Bucket=self.bucket_name, Key=storage_path)
+                except ClientError as e:
+                    if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                        raise FileNotFoundError(f"File not found: {storage_path}") from e
+                    raise
+
+            info = {
+                "name": storage_path.rsplit('/', 1)[-1],
+                "size": response["ContentLength"],
+                "content_type": response.get("ContentType"),
+                "last_modified": response["LastModified"],
+                "etag": response["ETag"].strip('"')
+            }
+            _file_info_cache[storage_path] = info
+            return info
 
         except Exception as e:
             logger.error(f"Error getting file info: {e}")
@@ -1,51 +1,229 @@
 """Weaviate vector store service for semantic search with OpenAI embeddings."""
 
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Tuple
 from uuid import UUID
 import weaviate
-from weaviate.classes.init import Auth
-from weaviate.classes.query import MetadataQuery
+from weaviate.classes.config import Configure, DataType, Property
+from weaviate.classes.data import DataObject
+from weaviate.classes.init import AdditionalConfig, Auth, Timeout
+from weaviate.classes.query import Filter, MetadataQuery
 from loguru import logger
+from time import monotonic
 import asyncio
+import itertools
+import numpy as np
 
 from app.core.config import settings
-from app.services.embedding_service import embedding_service
+from app.services.embedding_service import embedding_service, NormalizedStore
+
+
+# Chunk properties returned with each search hit
+_PROP_KEYS = (
+    "content", "document_id", "chunk_id", "page_number",
+    "start_char", "end_char", "filename", "document_type"
+)
+
+
+@lru_cache(maxsize=4096)
+def _collection_name(project_id: UUID) -> str:
+    """Weaviate collection name for a project."""
+    return f"Project_{str(project_id).replace('-', '_')}"
+
+
+@dataclass
+class _CacheNamespace:
+    """Cached query embeddings and results for one project and search shape."""
+
+    store: NormalizedStore
+    results: Dict[str, List[Dict]] = field(default_factory=dict)
+    thresholds: Dict[str, float] = field(default_factory=dict)
+    created_at: float = field(default_factory=monotonic)
+
+
+class SemanticQueryCache:
+    """
+    Search results keyed by query embedding, with per-region hit thresholds.
+
+    Every cached query is a region with its own similarity threshold, starting
+    at SEARCH_CACHE_THRESHOLD. A lookup hits when the nearest cached query is
+    at least that similar. On a near miss the fresh results are compared with
+    the neighbor's: if they match, the region's threshold moves down toward
+    the observed similarity (an EMA), and if they differ it moves up past it.
+    Regions with many paraphrases loosen, and dense regions stay strict.
+
+    The cache is per process and only invalidated by writes made through the
+    same process, so each project's entries are dropped SEARCH_CACHE_TTL
+    seconds after the first one was stored. That bounds how long results can
+    lag indexing or deletes done by another worker.
+    """
+
+    def __init__(self):
+        self._namespaces: Dict[Tuple[str, int, float], _CacheNamespace] = {}
+
+    @staticmethod
+    def _result_ids(results: List[Dict]) -> List[Optional[str]]:
+        """Identity of a result list, for comparing fresh and cached results."""
+        return [result.get("chunk_id") or result.get("content") for result in results]
+
+    def _namespace(self, key: Tuple[str, int, float]) -> Optional[_CacheNamespace]:
+        """Cached namespace for a key, dropping it once it has expired."""
+        namespace = self._namespaces.get(key)
+        if namespace is not None and monotonic() - namespace.created_at >= settings.SEARCH_CACHE_TTL:
+            del self._namespaces[key]
+            return None
+        return namespace
+
+    def lookup(
+        self,
+        key: Tuple[str, int, float],
+        query_vector: np.ndarray
+    ) -> Tuple[Optional[List[Dict]], Optional[Tuple[str, float]]]:
+        """
+        Find cached results for a query embedding.
+
+        Returns:
+            Tuple of (cached results or None, nearest (entry_id, similarity) or None)
+        """
+        namespace = self._namespace(key)
+        if namespace is None:
+            return None, None
+
+        matches = namespace.store.search(query_vector, k=1)
+        if not matches:
+            return None, None
+
+        entry_id, similarity = matches[0]
+        if similarity >= namespace.thresholds[entry_id]:
+            return [dict(result) for result in namespace.results[entry_id]], None
+        return None, (entry_id, similarity)
+
+    def store(
+        self,
+        key: Tuple[str, int, float],
+        query_vector: np.ndarray,
+        results: List[Dict],
+        nearest: Optional[Tuple[str, float]] = None
+    ) -> None:
+        """Cache fresh results and adapt the nearest region's threshold."""
+        namespace = self._namespace(key)
+        if namespace is None:
+            namespace = self._namespaces[key] = _CacheNamespace(
+                store=NormalizedStore(dimension=len(query_vector))
+            )
+
+        # The namespace may have expired and been recreated since the lookup
+        if nearest is not None and nearest[0] in namespace.thresholds:
+            entry_id, similarity = nearest
+            alpha = settings.SEARCH_CACHE_EMA_ALPHA
+            threshold = namespace.thresholds[entry_id]
+            if self._result_ids(namespace.results[entry_id]) == self._result_ids(results):
+                target = similarity
+            else:
+                target = min(similarity + settings.SEARCH_CACHE_THRESHOLD_MARGIN, 1.0)
+            namespace.thresholds[entry_id] = (1 - alpha) * threshold + alpha * target
+
+        if len(namespace.store) >= settings.SEARCH_CACHE_MAX_ENTRIES:
+            return
+
+        entry_id = str(len(namespace.store))
+        namespace.store.add([entry_id], [query_vector])
+        namespace.results[entry_id] = results
+        namespace.thresholds[entry_id] = settings.SEARCH_CACHE_THRESHOLD
+
+    def invalidate(self, project_id: UUID) -> None:
+        """Drop all cached results for a project."""
+        project = str(project_id)
+        for key in [key for key in self._namespaces if key[0] == project]:
+            del self._namespaces[key]
 
 
 class VectorStoreService:
     """Service for managing vector embeddings in Weaviate using OpenAI."""
 
     def __init__(self):
-        """Initialize Weaviate client."""
-        self.client = None
-        self._initialize_client()
+        """Set up the client pool; connections are opened on first use."""
+        self._clients: List[weaviate.WeaviateAsyncClient] = []
+        self._rr = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connecting: Optional[asyncio.Task] = None
+        self._collections: Dict[Tuple[weaviate.WeaviateAsyncClient, UUID], Any] = {}
+        self.query_cache = SemanticQueryCache()
+
+    async def _client(self) -> weaviate.WeaviateAsyncClient:
+        """
+        Next client in the pool, round-robin, connecting the pool if needed.
 
-    def _initialize_client(self):
-        """Initialize Weaviate client."""
+        Each client has its own gRPC channel, so concurrent queries spread over
+        several connections instead of contending on one. Async clients are
+        bound to the event loop they connected on, so the pool reconnects when
+        called from a new loop (e.g. a Celery task's asyncio.run).
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            stale, self._clients = self._clients, []
+            self._loop = loop
+            self._collections.clear()
+            self._connecting = loop.create_task(self._initialize_client())
+            # Clients from the previous loop can't be reused; close them so
+            # their gRPC channels and HTTP pools aren't leaked
+            await self._close_clients(stale)
+        if not self._clients:
+            await self._connecting
+
+        return self._clients[next(self._rr) % len(self._clients)]
+
+    async def _initialize_client(self):
+        """Connect WEAVIATE_POOL_SIZE async Weaviate clients."""
         try:
-            # Connect to Weaviate
-            if settings.WEAVIATE_API_KEY:
-                self.client = weaviate.connect_to_custom(
-                    http_host=settings.WEAVIATE_URL.replace('http://', '').replace('https://', ''),
-                    http_port=8080,
-                    http_secure=False,
-                    grpc_host=settings.WEAVIATE_URL.replace('http://', '').replace('https://', ''),
-                    grpc_port=50051,
-                    grpc_secure=False,
-                    auth_credentials=Auth.api_key(settings.WEAVIATE_API_KEY),
-                )
-            else:
-                self.client = weaviate.connect_to_local(
-                    host=settings.WEAVIATE_URL.replace('http://', '').replace('https://', ''),
-                    port=8080,
-                )
+            clients = [self._build_client() for _ in range(settings.WEAVIATE_POOL_SIZE)]
+            await asyncio.gather(*[client.connect() for client in clients])
+            self._clients = clients
 
-            logger.info("Weaviate client initialized successfully")
+            logger.info(f"Weaviate client pool initialized ({len(clients)} clients)")
         except Exception as e:
+            self._loop = None
             logger.error(f"Error initializing Weaviate client: {e}")
             raise
 
-    def create_schema(self, project_id: UUID):
+    async def _collection(self, project_id: UUID):
+        """Collection handle for a project on the next pooled client, memoized."""
+        client = await self._client()
+        key = (client, project_id)
+        collection = self._collections.get(key)
+        if collection is None:
+            collection = self._collections[key] = client.collections.get(_collection_name(project_id))
+        return collection
+
+    def _build_client(self) -> weaviate.WeaviateAsyncClient:
+        """Build one async Weaviate client (not yet connected)."""
+        # Large insert_many calls can outlast the default timeout while the
+        # server is busy, so inserts get their own, longer limit
+        additional_config = AdditionalConfig(
+            timeout=Timeout(
+                query=settings.WEAVIATE_QUERY_TIMEOUT,
+                insert=settings.WEAVIATE_INSERT_TIMEOUT
+            )
+        )
+        if settings.WEAVIATE_API_KEY:
+            return weaviate.use_async_with_custom(
+                http_host=settings.WEAVIATE_URL.replace('http://', '').replace('https://', ''),
+                http_port=8080,
+                http_secure=False,
+                grpc_host=settings.WEAVIATE_URL.replace('http://', '').replace('https://', ''),
+                grpc_port=50051,
+                grpc_secure=False,
+                auth_credentials=Auth.api_key(settings.WEAVIATE_API_KEY),
+                additional_config=additional_config,
+            )
+        return weaviate.use_async_with_local(
+            host=settings.WEAVIATE_URL.replace('http://', '').replace('https://', ''),
+            port=8080,
+            additional_config=additional_config,
+        )
+
+    async def create_schema(self, project_id: UUID):
         """
         Create Weaviate schema for a project.
 
@@ -53,59 +231,36 @@ class VectorStoreService:
             project_id: Project UUID
         """
         try:
-            collection_name = f"Project_{str(project_id).replace('-', '_')}"
+            collection_name = _collection_name(project_id)
+
+            client = await self._client()
 
             # Check if collection exists
-            if self.client.collections.exists(collection_name):
+            if await client.collections.exists(collection_name):
                 logger.info(f"Collection {collection_name} already exists")
                 return
 
             # Create collection
-            self.client.collections.create(
+            await client.collections.create(
                 name=collection_name,
                 properties=[
-                    {
-                        "name": "content",
-                        "dataType": ["text"],
-                        "description": "Document chunk content"
-                    },
-                    {
-                        "name": "document_id",
-                        "dataType": ["text"],
-                        "description": "Source document ID"
-                    },
-                    {
-                        "name": "chunk_id",
-                        "dataType": ["text"],
-                        "description": "Document chunk ID"
-                    },
-                    {
-                        "name": "page_number",
-                        "dataType": ["int"],
-                        "description": "Page number"
-                    },
-                    {
-                        "name": "start_char",
-                        "dataType": ["int"],
-                        "description": "Start character position"
-                    },
-                    {
-                        "name": "end_char",
-                        "dataType": ["int"],
-                        "description": "End character position"
-                    },
-                    {
-                        "name": "filename",
-                        "dataType": ["text"],
-                        "description": "Source filename"
-                    },
-                    {
-                        "name": "document_type",
-                        "dataType": ["text"],
-                        "description": "Document type (main/supporting)"
-                    }
+                    Property(name="content", data_type=DataType.TEXT, description="Document chunk content"),
+                    Property(name="document_id", data_type=DataType.TEXT, description="Source document ID"),
+                    Property(name="chunk_id", data_type=DataType.TEXT, description="Document chunk ID"),
+                    Property(name="page_number", data_type=DataType.INT, description="Page number"),
+                    Property(name="start_char", data_type=DataType.INT, description="Start character position"),
+                    Property(name="end_char", data_type=DataType.INT, description="End character position"),
+                    Property(name="filename", data_type=DataType.TEXT, description="Source filename"),
+                    Property(name="document_type", data_type=DataType.TEXT, description="Document type (main/supporting)")
                 ],
-                vectorizer_config=None  # We'll provide vectors manually
+                vectorizer_config=None,  # We'll provide vectors manually
+                # Scalar quantization keeps int8 vectors in memory (~4x smaller than
+                # float32); candidates are rescored against the full vectors on disk
+                vector_index_config=Configure.VectorIndex.hnsw(
+                    quantizer=Configure.VectorIndex.Quantizer.sq(
+                        rescore_limit=settings.WEAVIATE_SQ_RESCORE_LIMIT
+                    )
+                )
             )
 
             logger.info(f"Created Weaviate collection: {collection_name}")
@@ -114,7 +269,7 @@ class VectorStoreService:
             logger.error(f"Error creating Weaviate schema: {e}")
             raise
 
-    async def embed_text(self, text: str) -> List[float]:
+    async def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for text using OpenAI.
 
@@ -153,43 +308,65 @@ class VectorStoreService:
             List of Weaviate object IDs
         """
         try:
-            collection_name = f"Project_{str(project_id).replace('-', '_')}"
-            collection = self.client.collections.get(collection_name)
+            collection = await self._collection(project_id)
 
-            weaviate_ids = []
             batch_size = settings.WEAVIATE_BATCH_SIZE
-
-            # Process in batches
-            for i in range(0, len(chunks), batch_size):
-                batch = chunks[i:i + batch_size]
-
-                # Generate embeddings for entire batch using OpenAI
-                texts = [chunk["content"] for chunk in batch]
-                vectors = await embedding_service.embed_batch(texts)
-
-                with collection.batch.dynamic() as batch_context:
-                    for chunk, vector in zip(batch, vectors):
-                        # Prepare properties
-                        properties = {
-                            "content": chunk["content"],
-                            "document_id": str(document_id),
-                            "chunk_id": chunk.get("id", ""),
-                            "page_number": chunk.get("page_number", 0),
-                            "start_char": chunk.get("start_char", 0),
-                            "end_char": chunk.get("end_char", 0),
-                            "filename": filename,
-                            "document_type": document_type
-                        }
-
-                        # Add to batch
-                        uuid = batch_context.add_object(
-                            properties=properties,
-                            vector=vector
+            embed_batch_size = settings.WEAVIATE_EMBED_BATCH_SIZE
+            num_workers = settings.WEAVIATE_NUM_WORKERS
+            weaviate_ids: List[Optional[str]] = [None] * len(chunks)
+            document_id_str = str(document_id)
+
+            # Embedding runs ahead of the inserters through a bounded queue, so
+            # slice k+1 is being embedded while slice k is written to Weaviate
+            queue: asyncio.Queue = asyncio.Queue(maxsize=num_workers * 2)
+
+            async def embed_slices():
+                for start in range(0, len(chunks), embed_batch_size):
+                    chunk_slice = chunks[start:start + embed_batch_size]
+                    vectors = await embedding_service.embed_batch(
+                        [chunk["content"] for chunk in chunk_slice]
+                    )
+                    objects = [
+                        DataObject(
+                            properties={
+                                "content": chunk["content"],
+                                "document_id": document_id_str,
+                                "chunk_id": chunk.get("id", ""),
+                                "page_number": chunk.get("page_number", 0),
+                                "start_char": chunk.get("start_char", 0),
+                                "end_char": chunk.get("end_char", 0),
+                                "filename": filename,
+                                "document_type": document_type
+                            },
+                            vector=vector,
+                            uuid=chunk.get("id") or None  # Reuse the DB chunk id when given
                         )
-                        weaviate_ids.append(str(uuid))
+                        for chunk, vector in zip(chunk_slice, vectors)
+                    ]
+                    for offset in range(0, len(objects), batch_size):
+                        await queue.put((start + offset, objects[offset:offset + batch_size]))
+
+                for _ in range(num_workers):
+                    await queue.put(None)
+
+            async def insert_batches():
+                while (item := await queue.get()) is not None:
+                    start, batch = item
+                    response = await collection.data.insert_many(batch)
+                    if response.has_errors:
+                        raise RuntimeError(
+                            f"Failed to index {len(response.errors)} chunks: "
+                            f"{next(iter(response.errors.values())).message}"
+                        )
+                    for idx in range(len(batch)):
+                        weaviate_ids[start + idx] = str(response.uuids[idx])
 
-                logger.info(f"Indexed batch {i//batch_size + 1} ({len(batch)} chunks)")
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(embed_slices())
+                for _ in range(num_workers):
+                    tg.create_task(insert_batches())
 
+            self.query_cache.invalidate(project_id)
             logger.info(f"Indexed {len(chunks)} chunks for document {document_id}")
             return weaviate_ids
 
@@ -213,41 +390,72 @@ class VectorStoreService:
             limit: Maximum number of results
             min_similarity: Minimum similarity threshold
 
+        Returns:
+            List of similar chunks with metadata
+        """
+        # Generate query embedding using OpenAI
+        query_vector = await self.embed_text(query)
+
+        return await self.search_similar_by_vector(
+            project_id=project_id,
+            query_vector=query_vector,
+            limit=limit,
+            min_similarity=min_similarity
+        )
+
+    async def search_similar_by_vector(
+        self,
+        project_id: UUID,
+        query_vector: np.ndarray,
+        limit: int = 5,
+        min_similarity: float = 0.7
+    ) -> List[Dict]:
+        """
+        Search for similar chunks with a precomputed query embedding.
+
+        Lets callers embed many queries in one batch request up front.
+
+        Args:
+            project_id: Project UUID
+            query_vector: Query embedding
+            limit: Maximum number of results
+            min_similarity: Minimum similarity threshold
+
         Returns:
             List of similar chunks with metadata
         """
         try:
-            collection_name = f"Project_{str(project_id).replace('-', '_')}"
-            collection = self.client.collections.get(collection_name)
+            collection = await self._collection(project_id)
 
-            # Generate query embedding using OpenAI
-            query_vector = await self.embed_text(query)
+            # Near-duplicate queries are answered from the semantic cache
+            cache_key = (str(project_id), limit, min_similarity)
+            nearest = None
+            if settings.SEARCH_CACHE_ENABLED:
+                cached, nearest = self.query_cache.lookup(cache_key, query_vector)
+                if cached is not None:
+                    logger.debug(f"Semantic cache hit for query ({len(cached)} chunks)")
+                    return cached
 
             # Perform vector search
-            response = collection.query.near_vector(
+            # Project only the chunk properties we return and let the server
+            # drop hits below min_similarity before they are sent
+            response = await collection.query.near_vector(
                 near_vector=query_vector,
                 limit=limit,
+                distance=1 - min_similarity,
+                return_properties=list(_PROP_KEYS),
                 return_metadata=MetadataQuery(distance=True)
             )
 
-            # Process results
-            results = []
-            for obj in response.objects:
-                # Convert distance to similarity (cosine distance to similarity)
-                similarity = 1 - obj.metadata.distance
-
-                if similarity >= min_similarity:
-                    results.append({
-                        "content": obj.properties["content"],
-                        "document_id": obj.properties["document_id"],
-                        "chunk_id": obj.properties.get("chunk_id"),
-                        "page_number": obj.properties.get("page_number"),
-                        "start_char": obj.properties.get("start_char"),
-                        "end_char": obj.properties.get("end_char"),
-                        "filename": obj.properties.get("filename"),
-                        "document_type": obj.properties.get("document_type"),
-                        "similarity": similarity
-                    })
+            # Process results, converting cosine distance to similarity
+            results = [
+                {key: obj.properties.get(key) for key in _PROP_KEYS} | {"similarity": similarity}
+                for obj in response.objects
+                if (similarity := 1 - obj.metadata.distance) >= min_similarity
+            ]
+
+            if settings.SEARCH_CACHE_ENABLED:
+                self.query_cache.store(cache_key, query_vector, results, nearest)
 
             logger.info(f"Found {len(results)} similar chunks for query")
             return results
@@ -256,7 +464,7 @@ class VectorStoreService:
             logger.error(f"Error searching similar chunks: {e}")
             raise
 
-    def delete_document_chunks(self, project_id: UUID, document_id: UUID):
+    async def delete_document_chunks(self, project_id: UUID, document_id: UUID):
         """
         Delete all chunks for a document.
 
@@ -265,25 +473,21 @@ class VectorStoreService:
             document_id: Document UUID
         """
         try:
-            collection_name = f"Project_{str(project_id).replace('-', '_')}"
-            collection = self.client.collections.get(collection_name)
+            collection = await self._collection(project_id)
 
             # Delete chunks matching document_id
-            collection.data.delete_many(
-                where={
-                    "path": ["document_id"],
-                    "operator": "Equal",
-                    "valueText": str(document_id)
-                }
+            await collection.data.delete_many(
+                where=Filter.by_property("document_id").equal(str(document_id))
             )
 
+            self.query_cache.invalidate(project_id)
             logger.info(f"Deleted chunks for document {document_id}")
 
         except Exception as e:
             logger.error(f"Error deleting document chunks: {e}")
             raise
 
-    def delete_collection(self, project_id: UUID):
+    async def delete_collection(self, project_id: UUID):
         """
         Delete entire collection for a project.
 
@@ -291,21 +495,37 @@ class VectorStoreService:
             project_id: Project UUID
         """
         try:
-            collection_name = f"Project_{str(project_id).replace('-', '_')}"
+            collection_name = _collection_name(project_id)
 
-            if self.client.collections.exists(collection_name):
-                self.client.collections.delete(collection_name)
+            client = await self._client()
+            if await client.collections.exists(collection_name):
+                await client.collections.delete(collection_name)
                 logger.info(f"Deleted collection: {collection_name}")
 
+            for key in [key for key in self._collections if key[1] == project_id]:
+                del self._collections[key]
+
+            self.query_cache.invalidate(project_id)
+
         except Exception as e:
             logger.error(f"Error deleting collection: {e}")
             raise
 
-    def close(self):
-        """Close Weaviate client connection."""
-        if self.client:
-            self.client.close()
-            logger.info("Weaviate client connection closed")
+    @staticmethod
+    async def _close_clients(clients: List[weaviate.WeaviateAsyncClient]):
+        """Close clients best-effort, logging any that fail to close."""
+        results = await asyncio.gather(*[client.close() for client in clients], return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Error closing Weaviate client: {result}")
+        if clients:
+            logger.info(f"Closed {len(clients)} Weaviate client connections")
+
+    async def close(self):
+        """Close all Weaviate client connections."""
+        clients, self._clients, self._loop = self._clients, [], None
+        self._collections.clear()
+        await self._close_clients(clients)
 
 
 # Singleton instance
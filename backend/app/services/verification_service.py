@@ -1,33 +1,33 @@
 """Verification service using Langchain and Google Gemini."""
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from uuid import UUID
 from loguru import logger
+import asyncio
+import numpy as np
+import re
+import orjson
 
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
 from langchain.schema import HumanMessage, SystemMessage
 
 from app.core.config import settings
 from app.services.vector_store import vector_store
+from app.services.embedding_service import embedding_service
 from app.db.models import ValidationResult
 
+_JSON_BLOCK_RE = re.compile(r"\{.*\}", re.DOTALL)
 
-class VerificationService:
-    """Service for verifying document claims using AI."""
 
-    def __init__(self):
-        """Initialize verification service with Gemini LLM."""
-        self.llm = ChatGoogleGenerativeAI(
-            model=settings.GEMINI_MODEL,
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=settings.GEMINI_TEMPERATURE,
-            max_output_tokens=settings.GEMINI_MAX_TOKENS,
-        )
+def _as_page(value) -> Optional[int]:
+    """Normalize a page number from chunk metadata or LLM output to an int."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
 
-        # Verification prompt template
-        self.verification_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert document verification assistant specializing in IPO documents.
+_VERIFY_SYSTEM = """You are an expert document verification assistant specializing in IPO documents.
 Your task is to verify claims made in IPO documents against supporting evidence from source documents.
 
 For each claim, you must:
@@ -42,39 +42,58 @@ Classification criteria:
 - UNCERTAIN (Yellow): The claim is partially supported, evidence is ambiguous, or confidence is moderate
 - INCORRECT (Red): The claim contradicts evidence or is not supported by any evidence
 
-Be thorough, objective, and cite specific page numbers and quotes."""),
-            ("human", """Claim to verify:
+Be thorough, objective, and cite specific page numbers and quotes."""
+
+# The human message is header + evidence + instructions, built in one pass
+_VERIFY_HUMAN_HEADER = """Claim to verify:
 "{claim}"
 
 Background Context:
 {context}
 
 Supporting Evidence from Documents:
-{evidence}
+"""
+
+_VERIFY_HUMAN_INSTRUCTIONS = """
 
 Based on the evidence, classify this claim as VALIDATED, UNCERTAIN, or INCORRECT.
 Provide your response in the following JSON format:
-{{
+{
     "validation_result": "VALIDATED|UNCERTAIN|INCORRECT",
     "confidence_score": 0.0-1.0,
     "reasoning": "Detailed explanation of your assessment",
     "citations": [
-        {{
+        {
             "document": "filename",
             "page": page_number,
             "quote": "exact quote from source",
             "relevance": "how this evidence relates to the claim"
-        }}
+        }
     ]
-}}""")
-        ])
+}"""
+
+
+class VerificationService:
+    """Service for verifying document claims using AI."""
+
+    def __init__(self):
+        """Initialize verification service with Gemini LLM."""
+        self.llm = ChatGoogleGenerativeAI(
+            model=settings.GEMINI_MODEL,
+            google_api_key=settings.GOOGLE_API_KEY,
+            temperature=settings.GEMINI_TEMPERATURE,
+            max_output_tokens=settings.GEMINI_MAX_TOKENS,
+        )
+        self._system_message = SystemMessage(content=_VERIFY_SYSTEM)
 
     async def verify_sentence(
         self,
         sentence: str,
         project_id: UUID,
         context: str = "",
-        top_k: int = 5
+        top_k: int = 5,
+        query_vector: Optional[np.ndarray] = None,
+        raise_errors: bool = False
     ) -> Dict:
         """
         Verify a single sentence against supporting documents.
@@ -84,15 +103,20 @@ Provide your response in the following JSON format:
             project_id: Project UUID
             context: Background context for the project
             top_k: Number of similar chunks to retrieve
+            query_vector: Precomputed sentence embedding, if already available
+            raise_errors: Re-raise search, LLM and network errors instead of
+                returning them as an UNCERTAIN result
 
         Returns:
             Verification result with citations
         """
         try:
             # Retrieve similar chunks from vector store
-            similar_chunks = vector_store.search_similar(
+            if query_vector is None:
+                query_vector = await embedding_service.embed_text(sentence)
+            similar_chunks = await vector_store.search_similar_by_vector(
                 project_id=project_id,
-                query=sentence,
+                query_vector=query_vector,
                 limit=top_k,
                 min_similarity=settings.MIN_SIMILARITY_THRESHOLD
             )
@@ -106,15 +130,18 @@ Provide your response in the following JSON format:
                     "citations": []
                 }
 
-            # Format evidence for the prompt
-            evidence_text = self._format_evidence(similar_chunks)
-
-            # Create prompt
-            messages = self.verification_prompt.format_messages(
-                claim=sentence,
-                context=context or "No additional context provided.",
-                evidence=evidence_text
-            )
+            # Build the prompt directly, without a template formatting pass
+            messages = [
+                self._system_message,
+                HumanMessage(content="".join((
+                    _VERIFY_HUMAN_HEADER.format(
+                        claim=sentence,
+                        context=context or "No additional context provided."
+                    ),
+                    self._format_evidence(similar_chunks),
+                    _VERIFY_HUMAN_INSTRUCTIONS
+                )))
+            ]
 
             # Call Gemini
             response = await self.llm.ainvoke(messages)
@@ -125,6 +152,8 @@ Provide your response in the following JSON format:
 
         except Exception as e:
             logger.error(f"Error verifying sentence: {e}")
+            if raise_errors:
+                raise
             return {
                 "validation_result": ValidationResult.UNCERTAIN,
                 "confidence_score": 0.0,
@@ -142,17 +171,13 @@ Provide your response in the following JSON format:
         Returns:
             Formatted evidence string
         """
-        evidence_parts = []
-
-        for idx, chunk in enumerate(chunks, 1):
-            evidence_parts.append(
-                f"Evidence {idx} (Similarity: {chunk['similarity']:.2f}):\n"
-                f"Source: {chunk['filename']}\n"
-                f"Page: {chunk.get('page_number', 'N/A')}\n"
-                f"Content: {chunk['content']}\n"
-            )
-
-        return "\n".join(evidence_parts)
+        return "\n".join(
+            f"Evidence {idx} (Similarity: {chunk['similarity']:.2f}):\n"
+            f"Source: {chunk['filename']}\n"
+            f"Page: {chunk.get('page_number', 'N/A')}\n"
+            f"Content: {chunk['content']}\n"
+            for idx, chunk in enumerate(chunks, 1)
+        )
 
     def _parse_verification_response(self, response: str, chunks: List[Dict]) -> Dict:
         """
@@ -166,13 +191,10 @@ Provide your response in the following JSON format:
             Structured verification result
         """
         try:
-            import json
-            import re
-
             # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = _JSON_BLOCK_RE.search(response)
             if json_match:
-                result = json.loads(json_match.group())
+                result = orjson.loads(json_match.group())
             else:
                 # Fallback parsing
                 result = {
@@ -200,9 +222,10 @@ Provide your response in the following JSON format:
 
             # Process citations
             citations = []
+            chunk_index = self._index_chunks(chunks)
             for citation in result.get("citations", []):
                 # Try to match citation to original chunks
-                matching_chunk = self._find_matching_chunk(citation, chunks)
+                matching_chunk = self._find_matching_chunk(citation, chunks, chunk_index)
 
                 if matching_chunk:
                     citations.append({
@@ -234,24 +257,41 @@ Provide your response in the following JSON format:
                 "citations": []
             }
 
-    def _find_matching_chunk(self, citation: Dict, chunks: List[Dict]) -> Dict:
+    @staticmethod
+    def _index_chunks(chunks: List[Dict]) -> Dict[Optional[int], List[Dict]]:
+        """
+        Group evidence chunks by page number, keeping their best-first order.
+        """
+        chunks_by_page: Dict[Optional[int], List[Dict]] = {}
+        for chunk in chunks:
+            chunks_by_page.setdefault(_as_page(chunk.get("page_number")), []).append(chunk)
+        return chunks_by_page
+
+    def _find_matching_chunk(
+        self,
+        citation: Dict,
+        chunks: List[Dict],
+        chunk_index: Dict[Optional[int], List[Dict]]
+    ) -> Dict:
         """
         Find the chunk that best matches a citation.
 
         Args:
             citation: Citation from LLM
             chunks: List of evidence chunks
+            chunk_index: Result of _index_chunks(chunks), built once per response
 
         Returns:
             Matching chunk or None
         """
-        # Try to match by document name or page number
-        doc_name = citation.get("document", "").lower()
+        # Try to match by document name, and by page number when one is given
+        doc_name = (citation.get("document") or "").lower()
         page_num = citation.get("page")
 
-        for chunk in chunks:
-            if doc_name and doc_name in chunk.get("filename", "").lower():
-                if page_num is None or chunk.get("page_number") == page_num:
+        if doc_name:
+            candidates = chunks if page_num is None else chunk_index.get(_as_page(page_num), [])
+            for chunk in candidates:
+                if doc_name in chunk.get("filename", "").lower():
                     return chunk
 
         # Return first chunk as fallback
@@ -262,9 +302,9 @@ Provide your response in the following JSON format:
         sentences: List[str],
         project_id: UUID,
         context: str = ""
-    ) -> List[Dict]:
+    ) -> List[Optional[Dict]]:
         """
-        Verify multiple sentences in batch.
+        Verify multiple sentences concurrently, bounded by VERIFY_CONCURRENCY.
 
         Args:
             sentences: List of sentences to verify
@@ -272,19 +312,39 @@ Provide your response in the following JSON format:
             context: Background context
 
         Returns:
-            List of verification results
+            List of verification results, with None for each sentence whose
+            verification raised
         """
-        results = []
-
-        for sentence in sentences:
-            result = await self.verify_sentence(
-                sentence=sentence,
-                project_id=project_id,
-                context=context
-            )
-            results.append(result)
-
-        return results
+        # One embedding request for the whole batch instead of one per sentence
+        vectors = await embedding_service.embed_batch(sentences)
+        semaphore = asyncio.Semaphore(settings.VERIFY_CONCURRENCY)
+
+        async def verify_one(sentence: str, vector: np.ndarray) -> Dict:
+            async with semaphore:
+                return await self.verify_sentence(
+                    sentence=sentence,
+                    project_id=project_id,
+                    context=context,
+                    query_vector=vector,
+                    raise_errors=True
+                )
+
+        # gather keeps results in input order; one sentence failing doesn't
+        # discard the rest of the batch
+        results = await asyncio.gather(*[
+            verify_one(sentence, vector) for sentence, vector in zip(sentences, vectors)
+        ], return_exceptions=True)
+
+        verified: List[Optional[Dict]] = []
+        for sentence, result in zip(sentences, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error verifying sentence '{sentence[:80]}': {result}")
+                verified.append(None)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                verified.append(result)
+        return verified
 
 
 # Singleton instance
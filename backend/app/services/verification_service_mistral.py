@@ -7,12 +7,15 @@ This service provides production-grade claim verification with:
 - Structured JSON responses
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from uuid import UUID
 from loguru import logger
+import asyncio
+import numpy as np
 
 from app.core.config import settings
 from app.services.vector_store import vector_store
+from app.services.embedding_service import embedding_service
 from app.services.mistral_service import mistral_service
 from app.db.models import ValidationResult
 
@@ -26,7 +29,8 @@ class MistralVerificationService:
         sentence_page: Optional[int],
         project_id: UUID,
         context: str = "",
-        top_k: int = 5
+        top_k: int = 5,
+        query_vector: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Verify a single sentence against supporting documents using Mistral.
@@ -37,15 +41,18 @@ class MistralVerificationService:
             project_id: Project UUID
             context: Background context for the project
             top_k: Number of similar chunks to retrieve
+            query_vector: Precomputed sentence embedding, if already available
 
         Returns:
             Verification result with precise citations including page numbers
         """
         try:
             # Retrieve similar chunks from vector store
-            similar_chunks = await vector_store.search_similar(
+            if query_vector is None:
+                query_vector = await embedding_service.embed_text(sentence)
+            similar_chunks = await vector_store.search_similar_by_vector(
                 project_id=project_id,
-                query=sentence,
+                query_vector=query_vector,
                 limit=top_k,
                 min_similarity=settings.MIN_SIMILARITY_THRESHOLD
             )
@@ -125,12 +132,18 @@ class MistralVerificationService:
         """
         processed_citations = []
 
+        # Best-first chunks, so the first chunk seen for a page wins
+        chunks_by_page: Dict[int, Dict] = {}
+        for chunk in original_chunks:
+            if chunk.get("page_number") is not None:
+                chunks_by_page.setdefault(int(chunk["page_number"]), chunk)
+
         for citation in mistral_citations:
             # Extract page number from citation
             page_num = citation.get("source_page") or citation.get("page_number")
 
             # Try to match with original chunks for document_id
-            matching_chunk = self._find_chunk_by_page(page_num, original_chunks)
+            matching_chunk = self._find_chunk_by_page(page_num, original_chunks, chunks_by_page)
 
             processed_citation = {
                 "document_id": matching_chunk.get("document_id", "") if matching_chunk else "",
@@ -152,25 +165,17 @@ class MistralVerificationService:
     def _find_chunk_by_page(
         self,
         page_number: any,
-        chunks: List[Dict]
+        chunks: List[Dict],
+        chunks_by_page: Dict[int, Dict]
     ) -> Optional[Dict]:
         """Find chunk matching a specific page number."""
-        if page_number is None:
-            return chunks[0] if chunks else None
-
-        # Try to convert page_number to int
         try:
-            page_num = int(page_number)
+            matching_chunk = chunks_by_page.get(int(page_number))
         except (ValueError, TypeError):
-            return chunks[0] if chunks else None
-
-        # Find chunk with matching page
-        for chunk in chunks:
-            if chunk.get("page_number") == page_num:
-                return chunk
+            matching_chunk = None
 
         # Fallback to first chunk
-        return chunks[0] if chunks else None
+        return matching_chunk or (chunks[0] if chunks else None)
 
     async def verify_batch(
         self,
@@ -179,7 +184,7 @@ class MistralVerificationService:
         context: str = ""
     ) -> List[Dict]:
         """
-        Verify multiple sentences in batch.
+        Verify multiple sentences concurrently, bounded by VERIFY_CONCURRENCY.
 
         Args:
             sentences: List of sentence dictionaries with 'content' and 'page_number'
@@ -189,18 +194,26 @@ class MistralVerificationService:
         Returns:
             List of verification results
         """
-        results = []
-
-        for sentence_data in sentences:
-            result = await self.verify_sentence(
-                sentence=sentence_data.get("content", ""),
-                sentence_page=sentence_data.get("page_number"),
-                project_id=project_id,
-                context=context
-            )
-            results.append(result)
-
-        return results
+        # One embedding request for the whole batch instead of one per sentence
+        vectors = await embedding_service.embed_batch(
+            [sentence_data.get("content", "") for sentence_data in sentences]
+        )
+        semaphore = asyncio.Semaphore(settings.VERIFY_CONCURRENCY)
+
+        async def verify_one(sentence_data: Dict, vector: np.ndarray) -> Dict:
+            async with semaphore:
+                return await self.verify_sentence(
+                    sentence=sentence_data.get("content", ""),
+                    sentence_page=sentence_data.get("page_number"),
+                    project_id=project_id,
+                    context=context,
+                    query_vector=vector
+                )
+
+        # gather keeps results in input order
+        return await asyncio.gather(*[
+            verify_one(sentence_data, vector) for sentence_data, vector in zip(sentences, vectors)
+        ])
 
 
 # Singleton instance
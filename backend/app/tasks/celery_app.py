@@ -1,10 +1,33 @@
 """Celery application configuration."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Coroutine, Optional
+
 from celery import Celery
-from celery.signals import worker_ready, worker_shutdown
+from celery.signals import (
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+    worker_shutdown,
+)
+from kombu.serialization import register
 from loguru import logger
+import orjson
 
 from app.core.config import settings
+from app.core.http import close_http_client
+from app.core.redis import close_redis
+from app.db.async_engine import dispose_engine, reset_engine
+
+# orjson serializer; payloads are plain JSON, so they stay readable by json consumers
+register(
+    'orjson',
+    orjson.dumps,
+    orjson.loads,
+    content_type='application/x-orjson',
+    content_encoding='utf-8',
+)
 
 # Create Celery app
 celery_app = Celery(
@@ -19,15 +42,21 @@ celery_app = Celery(
 
 # Configure Celery
 celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    task_serializer='orjson',
+    accept_content=['orjson', 'json'],
+    result_serializer='orjson',
+    result_accept_content=['orjson', 'json'],
     timezone='UTC',
     enable_utc=True,
     task_track_started=settings.CELERY_TASK_TRACK_STARTED,
     task_time_limit=settings.CELERY_TASK_TIME_LIMIT,
     task_soft_time_limit=settings.CELERY_TASK_SOFT_TIME_LIMIT,
-    worker_prefetch_multiplier=1,
+    # Each prefork process runs one task at a time, and indexing and
+    # verification tasks can run for minutes, so reserving more than one only
+    # queues jobs behind a long one while other processes sit idle
+    worker_prefetch_multiplier=settings.CELERY_PREFETCH_MULTIPLIER,
+    task_compression='gzip',  # Evidence and extraction payloads are large and repetitive
+    result_compression='gzip',
     worker_max_tasks_per_child=1000,
     task_acks_late=True,
     task_reject_on_worker_lost=True,
@@ -35,6 +64,72 @@ celery_app.conf.update(
 )
 
 
+# One event loop per worker process, reused by every task it runs so that
+# loop-bound clients (asyncpg pool, httpx, Weaviate) persist across tasks
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _new_worker_loop() -> asyncio.AbstractEventLoop:
+    """Create and install the worker process's event loop."""
+    global _worker_loop
+    if settings.CELERY_USE_UVLOOP:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    _worker_loop = asyncio.new_event_loop()
+    # Thread pool behind asyncio.to_thread (document parsing, chunking)
+    _worker_loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.IO_THREADS, thread_name_prefix="worker-io")
+    )
+    asyncio.set_event_loop(_worker_loop)
+    return _worker_loop
+
+
+def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine to completion on the worker's persistent event loop.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    loop = _worker_loop
+    if loop is None or loop.is_closed():
+        loop = _new_worker_loop()
+    return loop.run_until_complete(coro)
+
+
+@worker_process_init.connect
+def on_worker_process_init(**kwargs):
+    """Drop inherited DB connections and start the process's event loop."""
+    reset_engine()
+    _new_worker_loop()
+    logger.info(f"Worker process event loop ready (uvloop={settings.CELERY_USE_UVLOOP})")
+
+
+async def _close_worker_clients():
+    """Close the loop-bound clients used by tasks."""
+    from app.services.vector_store import vector_store
+
+    for close in (dispose_engine, vector_store.close, close_http_client, close_redis):
+        try:
+            await close()
+        except Exception as e:
+            logger.warning(f"Error closing worker client: {e}")
+
+
+@worker_process_shutdown.connect
+def on_worker_process_shutdown(**kwargs):
+    """Close pooled connections and the event loop before the process exits."""
+    loop = _worker_loop
+    if loop is None or loop.is_closed():
+        return
+    loop.run_until_complete(_close_worker_clients())
+    loop.close()
+
+
 @worker_ready.connect
 def on_worker_ready(**kwargs):
     """Execute when worker is ready."""
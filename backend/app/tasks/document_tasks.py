@@ -1,40 +1,37 @@
 """Celery tasks for document processing and indexing."""
 
-from uuid import UUID
-from loguru import logger
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Dict, List
+from uuid import UUID, uuid4
+from celery import Signature, chord, group
 import asyncio
+from loguru import logger
+from sqlalchemy import delete, func, insert, or_, select, update
 
-from app.tasks.celery_app import celery_app
+from app.tasks.celery_app import celery_app, run_async
+from app.db.async_engine import get_async_session
 from app.core.config import settings
-from app.services.document_processor import DocumentProcessor
+from app.services.document_processor import get_document_processor
 from app.services.vector_store import vector_store
 from app.db.models import Document, DocumentChunk, Project
-from datetime import datetime
-
-
-def get_async_session():
-    """Create async database session for Celery tasks."""
-    DATABASE_URL = settings.DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://')
-    engine = create_async_engine(DATABASE_URL)
-    return AsyncSession(engine)
+from datetime import datetime, timedelta
 
 
 @celery_app.task(bind=True, name='index_document')
-def index_document_task(self, document_id: str, project_id: str):
+def index_document_task(self, document_id: str, project_id: str, report_errors: bool = False):
     """
     Index a document by processing and storing in vector database.
 
     Args:
         document_id: Document UUID
         project_id: Project UUID
+        report_errors: Return a failed result instead of raising; used inside
+            project chords, where one raising task would stop the callback
     """
     try:
         logger.info(f"Starting indexing for document {document_id}")
 
         # Run async task
-        result = asyncio.run(
+        result = run_async(
             _index_document_async(
                 UUID(document_id),
                 UUID(project_id),
@@ -47,6 +44,13 @@ def index_document_task(self, document_id: str, project_id: str):
 
     except Exception as e:
         logger.error(f"Error indexing document {document_id}: {e}")
+        if report_errors:
+            return {
+                "document_id": document_id,
+                "chunks_indexed": 0,
+                "status": "failed",
+                "error": str(e)
+            }
         raise
 
 
@@ -56,134 +60,268 @@ async def _index_document_async(
     task_id: str
 ):
     """Async implementation of document indexing."""
+    claimed = False
     async with get_async_session() as session:
         try:
-            # Get document
+            # Claim the document with a short committed update, so no lock or
+            # transaction is held while it is parsed, embedded and indexed. A
+            # claim older than the task time limit belongs to a dead worker.
+            # Only the columns indexing reads are returned.
+            stale_before = datetime.utcnow() - timedelta(seconds=settings.CELERY_TASK_TIME_LIMIT)
             result = await session.execute(
-                select(Document).where(Document.id == document_id)
+                update(Document)
+                .where(
+                    Document.id == document_id,
+                    Document.indexed == False,
+                    or_(
+                        Document.indexing_started_at.is_(None),
+                        Document.indexing_started_at < stale_before
+                    )
+                )
+                .values(indexing_started_at=datetime.utcnow())
+                .returning(
+                    Document.file_path,
+                    Document.original_filename,
+                    Document.document_type
+                )
             )
-            document = result.scalar_one_or_none()
+            document = result.one_or_none()
+            await session.commit()
 
             if not document:
-                raise ValueError(f"Document {document_id} not found")
+                state = await session.execute(
+                    select(Document.indexed).where(Document.id == document_id)
+                )
+                indexed = state.scalar_one_or_none()
+                if indexed is None:
+                    raise ValueError(f"Document {document_id} not found")
+
+                if indexed:
+                    logger.info(f"Document {document_id} is already indexed")
+                else:
+                    logger.info(f"Document {document_id} is being indexed by another worker")
+                return {
+                    "document_id": str(document_id),
+                    "chunks_indexed": 0,
+                    "status": "skipped"
+                }
+            claimed = True
 
             # Ensure Weaviate schema exists
-            vector_store.create_schema(project_id)
+            await vector_store.create_schema(project_id)
 
             # Process document
-            processor = DocumentProcessor(
+            processor = get_document_processor(
                 chunk_size=settings.CHUNK_SIZE,
-                chunk_overlap=settings.CHUNK_OVERLAP
+                stride=settings.CHUNK_STRIDE or int(settings.CHUNK_SIZE * 0.75)
             )
 
             processed = await processor.process_document_for_indexing(document.file_path)
 
-            # Store chunks in database
-            chunk_records = []
+            # Chunk ids are generated up front and reused as the Weaviate object
+            # ids, so the DB insert and vector indexing can run side by side
+            rows = []
             for idx, chunk in enumerate(processed["chunks"]):
-                chunk_record = DocumentChunk(
-                    document_id=document_id,
-                    chunk_index=idx,
-                    content=chunk["content"],
-                    page_number=chunk.get("page_number"),
-                    start_char=chunk.get("start_char"),
-                    end_char=chunk.get("end_char"),
-                    metadata=chunk.get("metadata", {})
-                )
-                chunk_records.append(chunk_record)
-                session.add(chunk_record)
-
-            await session.commit()
+                chunk_id = uuid4()
+                rows.append({
+                    "id": chunk_id,
+                    "document_id": document_id,
+                    "chunk_index": idx,
+                    "content": chunk["content"],
+                    "page_number": chunk.get("page_number"),
+                    "start_char": chunk.get("start_char"),
+                    "end_char": chunk.get("end_char"),
+                    "weaviate_id": str(chunk_id),
+                    "metadata": chunk.get("metadata", {})
+                })
 
-            # Index chunks in Weaviate
             chunks_for_indexing = [
                 {
-                    "id": str(chunk.id),
-                    "content": chunk.content,
-                    "page_number": chunk.page_number,
-                    "start_char": chunk.start_char,
-                    "end_char": chunk.end_char
+                    "id": row["weaviate_id"],
+                    "content": row["content"],
+                    "page_number": row["page_number"],
+                    "start_char": row["start_char"],
+                    "end_char": row["end_char"]
                 }
-                for chunk in chunk_records
+                for row in rows
             ]
 
-            weaviate_ids = vector_store.index_chunks(
-                project_id=project_id,
-                chunks=chunks_for_indexing,
-                document_id=document_id,
-                filename=document.original_filename,
-                document_type=document.document_type.value
-            )
+            # Chunk rows are committed right away rather than held in an open
+            # transaction while the vectors are written
+            async def insert_chunks():
+                if rows:
+                    await session.execute(insert(DocumentChunk.__table__), rows)
+                    await session.commit()
 
-            # Update chunk records with Weaviate IDs
-            for chunk_record, weaviate_id in zip(chunk_records, weaviate_ids):
-                chunk_record.weaviate_id = weaviate_id
+            # The TaskGroup cancels and awaits the other write when one fails, so
+            # cleanup and rollback never race a write still in flight
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(insert_chunks())
+                    tg.create_task(vector_store.index_chunks(
+                        project_id=project_id,
+                        chunks=chunks_for_indexing,
+                        document_id=document_id,
+                        filename=document.original_filename,
+                        document_type=document.document_type.value
+                    ))
+            except* Exception as errors:
+                # Don't leave vectors or chunk rows behind for a failed index
+                await session.rollback()
+                try:
+                    await vector_store.delete_document_chunks(project_id, document_id)
+                except Exception as e:
+                    logger.warning(f"Error removing vectors for document {document_id}: {e}")
+                try:
+                    await session.execute(
+                        delete(DocumentChunk.__table__).where(
+                            DocumentChunk.__table__.c.document_id == document_id
+                        )
+                    )
+                    await session.commit()
+                except Exception as e:
+                    await session.rollback()
+                    logger.warning(f"Error removing chunk rows for document {document_id}: {e}")
+                raise errors.exceptions[0]
 
             # Mark document as indexed
-            document.indexed = True
-            document.indexed_at = datetime.utcnow()
-            document.page_count = processed.get("metadata", {}).get("page_count", 0)
+            await session.execute(
+                update(Document)
+                .where(Document.id == document_id)
+                .values(
+                    indexed=True,
+                    indexed_at=datetime.utcnow(),
+                    indexing_started_at=None,
+                    page_count=processed.get("metadata", {}).get("page_count", 0)
+                )
+            )
 
             await session.commit()
 
             return {
                 "document_id": str(document_id),
-                "chunks_indexed": len(chunk_records),
+                "chunks_indexed": len(rows),
                 "status": "completed"
             }
 
         except Exception as e:
             await session.rollback()
             logger.error(f"Error in async indexing: {e}")
+
+            # Release the claim so the document can be retried right away
+            if claimed:
+                try:
+                    await session.execute(
+                        update(Document)
+                        .where(Document.id == document_id)
+                        .values(indexing_started_at=None)
+                    )
+                    await session.commit()
+                except Exception as release_error:
+                    logger.warning(f"Error releasing claim on document {document_id}: {release_error}")
             raise
 
 
 @celery_app.task(bind=True, name='index_project_documents')
 def index_project_documents_task(self, project_id: str):
     """
-    Index all documents in a project.
+    Index all unindexed documents in a project.
+
+    Each document is indexed by its own index_document task so the work
+    spreads across the worker pool; finalize_project_index runs once all of
+    them have finished.
 
     Args:
         project_id: Project UUID
     """
     try:
         logger.info(f"Starting project indexing for {project_id}")
-        result = asyncio.run(_index_project_documents_async(UUID(project_id)))
-        logger.info(f"Successfully indexed project {project_id}")
-        return result
+        signatures = run_async(_index_document_signatures(UUID(project_id)))
+
+        if not signatures:
+            logger.info(f"No unindexed documents in project {project_id}")
+            return {
+                "project_id": project_id,
+                "documents_queued": 0,
+                "status": "completed"
+            }
+
+        result = chord(group(signatures))(finalize_project_index.s(project_id))
+
+        logger.info(f"Queued {len(signatures)} documents for indexing in project {project_id}")
+        return {
+            "project_id": project_id,
+            "documents_queued": len(signatures),
+            "finalize_task_id": result.id,
+            "status": "queued"
+        }
 
     except Exception as e:
         logger.error(f"Error indexing project {project_id}: {e}")
         raise
 
 
-async def _index_project_documents_async(project_id: UUID):
-    """Async implementation of project document indexing."""
+@celery_app.task(name='finalize_project_index')
+def finalize_project_index(results: List[Dict], project_id: str):
+    """
+    Summarize a project indexing run once every document task has finished.
+
+    Args:
+        results: Return values of the index_document tasks
+        project_id: Project UUID
+    """
+    chunks_indexed = sum(result.get("chunks_indexed", 0) for result in results)
+    documents_indexed = sum(1 for result in results if result.get("status") == "completed")
+    documents_failed = sum(1 for result in results if result.get("status") == "failed")
+    remaining = run_async(_count_unindexed_documents(UUID(project_id)))
+
+    logger.info(
+        f"Indexed {documents_indexed} documents ({chunks_indexed} chunks) in project {project_id}; "
+        f"{documents_failed} failed, {remaining} still unindexed"
+    )
+    return {
+        "project_id": project_id,
+        "documents_indexed": documents_indexed,
+        "documents_failed": documents_failed,
+        "chunks_indexed": chunks_indexed,
+        "documents_remaining": remaining,
+        "status": "completed"
+    }
+
+
+def _unindexed_documents(project_id: UUID):
+    """
+    WHERE criteria for a project's documents that are not indexed yet.
+
+    Matches the ix_doc_unindexed partial index, so keep the predicate in sync
+    with migration 004.
+    """
+    return Document.project_id == project_id, Document.indexed == False
+
+
+async def _index_document_signatures(project_id: UUID) -> List[Signature]:
+    """
+    Build an index_document signature per unindexed document.
+
+    Ids are read through a server-side cursor, so large projects are never
+    materialized as a full result set.
+    """
     async with get_async_session() as session:
-        # Get all unindexed documents
-        result = await session.execute(
-            select(Document).where(
-                Document.project_id == project_id,
-                Document.indexed == False
-            )
+        document_ids = await session.stream_scalars(
+            select(Document.id)
+            .where(*_unindexed_documents(project_id))
+            .execution_options(yield_per=settings.DB_STREAM_YIELD_PER)
         )
-        documents = result.scalars().all()
+        return [
+            index_document_task.s(str(document_id), str(project_id), report_errors=True)
+            async for document_id in document_ids
+        ]
 
-        indexed_count = 0
-        for document in documents:
-            try:
-                await _index_document_async(
-                    document.id,
-                    project_id,
-                    f"project_index_{project_id}"
-                )
-                indexed_count += 1
-            except Exception as e:
-                logger.error(f"Error indexing document {document.id}: {e}")
 
-        return {
-            "project_id": str(project_id),
-            "documents_indexed": indexed_count,
-            "total_documents": len(documents),
-            "status": "completed"
-        }
+async def _count_unindexed_documents(project_id: UUID) -> int:
+    """Count a project's documents that are not indexed yet."""
+    async with get_async_session() as session:
+        result = await session.execute(
+            select(func.count()).select_from(Document).where(*_unindexed_documents(project_id))
+        )
+        return result.scalar_one()
@@ -1,15 +1,20 @@
 """Celery tasks for document verification."""
 
+from collections import Counter
+from typing import List
 from uuid import UUID
 from loguru import logger
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-import asyncio
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from datetime import datetime
+from time import monotonic
+import orjson
 
-from app.tasks.celery_app import celery_app
+from app.tasks.celery_app import celery_app, run_async
+from app.db.async_engine import get_async_session
+from app.core.redis import get_redis
 from app.core.config import settings
-from app.services.document_processor import DocumentProcessor
+from app.services.document_processor import get_document_processor
 from app.services.verification_service import verification_service
 from app.db.models import (
     VerificationJob, Document, Project, VerifiedSentence,
@@ -17,13 +22,6 @@ from app.db.models import (
 )
 
 
-def get_async_session():
-    """Create async database session for Celery tasks."""
-    DATABASE_URL = settings.DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://')
-    engine = create_async_engine(DATABASE_URL)
-    return AsyncSession(engine)
-
-
 @celery_app.task(bind=True, name='run_verification')
 def run_verification_task(self, verification_job_id: str):
     """
@@ -36,7 +34,7 @@ def run_verification_task(self, verification_job_id: str):
         logger.info(f"Starting verification job {verification_job_id}")
 
         # Run async task
-        result = asyncio.run(
+        result = run_async(
             _run_verification_async(
                 UUID(verification_job_id),
                 self.request.id
@@ -50,7 +48,7 @@ def run_verification_task(self, verification_job_id: str):
         logger.error(f"Error in verification job {verification_job_id}: {e}")
 
         # Update job status to failed
-        asyncio.run(_update_job_status(
+        run_async(_update_job_status(
             UUID(verification_job_id),
             VerificationStatus.FAILED,
             error_message=str(e)
@@ -92,8 +90,13 @@ async def _run_verification_async(job_id: UUID, task_id: str):
             )
             project = result.scalar_one_or_none()
 
+            # Read up front: a rollback expires every loaded attribute, and an
+            # expired attribute can't be lazily reloaded in an async session
+            project_id = job.project_id
+            context = project.background_context if project else ""
+
             # Process main document to extract sentences
-            processor = DocumentProcessor()
+            processor = get_document_processor()
             processed = await processor.process_document_for_verification(main_doc.file_path)
             sentences = processed["sentences"]
 
@@ -101,74 +104,143 @@ async def _run_verification_async(job_id: UUID, task_id: str):
             job.total_sentences = len(sentences)
             await session.commit()
 
+            # verified_sentences is committed with each saved checkpoint, so a
+            # retried or restarted job resumes after the last one
+            start = job.verified_sentences or 0
+            if start:
+                logger.info(f"Resuming verification job {job_id} at sentence {start + 1}/{len(sentences)}")
+
             # Verify sentences in batches
             batch_size = settings.VERIFICATION_BATCH_SIZE
-            validated_count = 0
-            uncertain_count = 0
-            incorrect_count = 0
-
-            for i in range(0, len(sentences), batch_size):
+            counts: Counter = Counter({
+                ValidationResult.VALIDATED: job.validated_count or 0,
+                ValidationResult.UNCERTAIN: job.uncertain_count or 0,
+                ValidationResult.INCORRECT: job.incorrect_count or 0
+            } if start else {})
+
+            # A progress event is buffered per saved batch; buffered events are
+            # flushed in one pipeline every ~1% of sentences or
+            # VERIFICATION_PROGRESS_INTERVAL seconds, whichever comes first
+            publish_every = max(1, len(sentences) // 100)
+            pending_progress: List[bytes] = []
+            last_published = start
+            last_publish_time = monotonic()
+
+            # Verified rows are held until the whole-number progress changes,
+            # then saved with the progress in one commit
+            pending_rows = []
+            checkpoint_start = start
+            committed_percent = int(job.progress or 0)
+
+            for i in range(start, len(sentences), batch_size):
                 batch = sentences[i:i + batch_size]
 
-                for sentence_data in batch:
-                    try:
-                        # Verify sentence
-                        verification_result = await verification_service.verify_sentence(
-                            sentence=sentence_data["content"],
-                            project_id=job.project_id,
-                            context=project.background_context if project else ""
-                        )
-
-                        # Create verified sentence record
-                        verified_sentence = VerifiedSentence(
-                            verification_job_id=job_id,
-                            sentence_index=sentence_data["index"],
-                            content=sentence_data["content"],
-                            page_number=sentence_data.get("page_number"),
-                            start_char=sentence_data.get("start_char"),
-                            end_char=sentence_data.get("end_char"),
-                            validation_result=verification_result["validation_result"],
-                            confidence_score=verification_result.get("confidence_score"),
-                            reasoning=verification_result.get("reasoning"),
-                            citations=verification_result.get("citations", [])
+                # Verify the batch concurrently (bounded by VERIFY_CONCURRENCY),
+                # with one embedding request for all of its sentences
+                # A batch is only counted once every sentence in it has a result;
+                # otherwise the job fails and a retry resumes from the last
+                # saved checkpoint
+                try:
+                    results = await verification_service.verify_batch(
+                        sentences=[sentence_data["content"] for sentence_data in batch],
+                        project_id=project_id,
+                        context=context
+                    )
+
+                    # Give sentences whose verification raised one more try
+                    failed = [idx for idx, result in enumerate(results) if result is None]
+                    if failed:
+                        retried = await verification_service.verify_batch(
+                            sentences=[batch[idx]["content"] for idx in failed],
+                            project_id=project_id,
+                            context=context
                         )
-
-                        session.add(verified_sentence)
-
-                        # Update counts
-                        if verification_result["validation_result"] == ValidationResult.VALIDATED:
-                            validated_count += 1
-                        elif verification_result["validation_result"] == ValidationResult.UNCERTAIN:
-                            uncertain_count += 1
-                        elif verification_result["validation_result"] == ValidationResult.INCORRECT:
-                            incorrect_count += 1
-
-                        # Update progress
-                        job.verified_sentences = i + len(batch)
-                        job.progress = (job.verified_sentences / job.total_sentences) * 100
-                        job.validated_count = validated_count
-                        job.uncertain_count = uncertain_count
-                        job.incorrect_count = incorrect_count
-
-                        await session.commit()
-
-                        logger.info(
-                            f"Verified sentence {sentence_data['index'] + 1}/{len(sentences)}: "
-                            f"{verification_result['validation_result'].value}"
+                        for idx, result in zip(failed, retried):
+                            results[idx] = result
+
+                    unverified = sum(1 for result in results if result is None)
+                    if unverified:
+                        raise RuntimeError(f"{unverified} sentences could not be verified")
+                except Exception as e:
+                    logger.error(f"Error verifying batch starting at sentence {i + 1}: {e}")
+                    raise
+
+                for sentence_data, verification_result in zip(batch, results):
+                    # Queue verified sentence row for the checkpoint insert
+                    pending_rows.append({
+                        "verification_job_id": job_id,
+                        "sentence_index": sentence_data["index"],
+                        "content": sentence_data["content"],
+                        "page_number": sentence_data.get("page_number"),
+                        "start_char": sentence_data.get("start_char"),
+                        "end_char": sentence_data.get("end_char"),
+                        "validation_result": verification_result["validation_result"],
+                        "confidence_score": verification_result.get("confidence_score"),
+                        "reasoning": verification_result.get("reasoning"),
+                        "citations": verification_result.get("citations", [])
+                    })
+
+                    logger.info(
+                        f"Verified sentence {sentence_data['index'] + 1}/{len(sentences)}: "
+                        f"{verification_result['validation_result'].value}"
+                    )
+
+                verified_so_far = i + len(batch)
+                percent = int((verified_so_far / len(sentences)) * 100)
+                if percent == committed_percent and verified_so_far < len(sentences):
+                    continue
+
+                # Persist the pending sentences and progress in one commit
+                job.verified_sentences = verified_so_far
+                job.progress = (verified_so_far / len(sentences)) * 100
+                batch_counts = counts + Counter(row["validation_result"] for row in pending_rows)
+                job.validated_count = batch_counts[ValidationResult.VALIDATED]
+                job.uncertain_count = batch_counts[ValidationResult.UNCERTAIN]
+                job.incorrect_count = batch_counts[ValidationResult.INCORRECT]
+
+                try:
+                    if pending_rows:
+                        # Rows a previous attempt already saved are skipped
+                        await session.execute(
+                            insert(VerifiedSentence).on_conflict_do_nothing(
+                                index_elements=["verification_job_id", "sentence_index"]
+                            ),
+                            pending_rows
                         )
-
-                        # Send real-time update via WebSocket
-                        await send_verification_progress(
-                            job_id=job_id,
-                            status=VerificationStatus.PROCESSING,
-                            progress=job.progress,
-                            current_sentence=job.verified_sentences,
-                            total_sentences=job.total_sentences
-                        )
-
-                    except Exception as e:
-                        logger.error(f"Error verifying sentence {sentence_data['index']}: {e}")
-                        # Continue with next sentence
+                    await session.commit()
+                except Exception as e:
+                    # Fail the job instead of moving past unsaved sentences; a
+                    # retry resumes from the last saved checkpoint
+                    logger.error(
+                        f"Error saving verified sentences {checkpoint_start + 1}-{verified_so_far}: {e}"
+                    )
+                    raise
+
+                # Only a committed checkpoint clears the buffer and moves on
+                pending_rows = []
+                checkpoint_start = verified_so_far
+                counts = batch_counts
+                committed_percent = percent
+
+                pending_progress.append(_progress_event(
+                    job_id=job_id,
+                    status=VerificationStatus.PROCESSING,
+                    progress=job.progress,
+                    current_sentence=job.verified_sentences,
+                    total_sentences=job.total_sentences
+                ))
+
+                if (
+                    job.verified_sentences - last_published < publish_every
+                    and monotonic() - last_publish_time < settings.VERIFICATION_PROGRESS_INTERVAL
+                ):
+                    continue
+
+                # Send real-time updates via WebSocket
+                await publish_verification_progress(job_id, pending_progress)
+                pending_progress = []
+                last_published = job.verified_sentences
+                last_publish_time = monotonic()
 
             # Mark job as completed
             job.status = VerificationStatus.COMPLETED
@@ -176,22 +248,23 @@ async def _run_verification_async(job_id: UUID, task_id: str):
             job.progress = 100.0
             await session.commit()
 
-            # Send completion update
-            await send_verification_progress(
+            # Send any buffered updates together with the completion update
+            pending_progress.append(_progress_event(
                 job_id=job_id,
                 status=VerificationStatus.COMPLETED,
                 progress=100.0,
                 current_sentence=job.total_sentences,
                 total_sentences=job.total_sentences
-            )
+            ))
+            await publish_verification_progress(job_id, pending_progress)
 
             return {
                 "job_id": str(job_id),
                 "status": "completed",
                 "total_sentences": job.total_sentences,
-                "validated": validated_count,
-                "uncertain": uncertain_count,
-                "incorrect": incorrect_count
+                "validated": counts[ValidationResult.VALIDATED],
+                "uncertain": counts[ValidationResult.UNCERTAIN],
+                "incorrect": counts[ValidationResult.INCORRECT]
             }
 
         except Exception as e:
@@ -205,22 +278,71 @@ async def _update_job_status(
     status: VerificationStatus,
     error_message: str = None
 ):
-    """Update verification job status."""
+    """Update verification job status with a single UPDATE, without loading the job."""
+    values = {"status": status}
+    if error_message:
+        values["error_message"] = error_message
+    if status == VerificationStatus.COMPLETED:
+        values["completed_at"] = datetime.utcnow()
+        values["progress"] = 100.0
+
     async with get_async_session() as session:
-        result = await session.execute(
-            select(VerificationJob).where(VerificationJob.id == job_id)
+        await session.execute(
+            update(VerificationJob)
+            .where(VerificationJob.id == job_id)
+            .values(**values)
         )
-        job = result.scalar_one_or_none()
+        await session.commit()
 
-        if job:
-            job.status = status
-            if error_message:
-                job.error_message = error_message
-            if status == VerificationStatus.COMPLETED:
-                job.completed_at = datetime.utcnow()
-                job.progress = 100.0
 
-            await session.commit()
+def _progress_event(
+    job_id: UUID,
+    status: VerificationStatus,
+    progress: float,
+    current_sentence: int,
+    total_sentences: int
+) -> bytes:
+    """
+    Encode a verification progress update for publishing.
+
+    orjson serializes the UUID and enum natively and returns bytes, which are
+    published as-is; consumers can orjson.loads the message data directly.
+    """
+    return orjson.dumps({
+        "job_id": job_id,
+        "status": status,
+        "progress": progress,
+        "current_sentence": current_sentence,
+        "total_sentences": total_sentences,
+        "message": f"Verified {current_sentence} of {total_sentences} sentences"
+    })
+
+
+async def publish_verification_progress(job_id: UUID, events: List[bytes]):
+    """
+    Publish encoded progress updates to the job's Redis channel.
+
+    The events are sent in one non-transactional pipeline, so a flush costs a
+    single round trip however many updates were buffered.
+
+    Args:
+        job_id: Verification job UUID
+        events: Updates built by _progress_event, oldest first
+    """
+    if not events:
+        return
+
+    try:
+        channel = f"verification_progress_{job_id}"
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.publish(channel, event)
+            await pipe.execute()
+
+        logger.debug(f"Published {len(events)} progress updates for job {job_id}")
+
+    except Exception as e:
+        logger.error(f"Error sending progress update: {e}")
 
 
 async def send_verification_progress(
@@ -236,28 +358,10 @@ async def send_verification_progress(
     This would normally use the Socket.IO instance from main.py,
     but for Celery tasks we can use Redis pub/sub or HTTP callback.
     """
-    try:
-        import redis
-        from app.core.config import settings
-
-        redis_client = redis.from_url(settings.REDIS_URL)
-
-        # Publish progress update to Redis channel
-        progress_data = {
-            "job_id": str(job_id),
-            "status": status.value,
-            "progress": progress,
-            "current_sentence": current_sentence,
-            "total_sentences": total_sentences,
-            "message": f"Verified {current_sentence} of {total_sentences} sentences"
-        }
-
-        redis_client.publish(
-            f"verification_progress_{job_id}",
-            str(progress_data)
-        )
-
-        logger.debug(f"Published progress update for job {job_id}")
-
-    except Exception as e:
-        logger.error(f"Error sending progress update: {e}")
+    await publish_verification_progress(job_id, [_progress_event(
+        job_id=job_id,
+        status=status,
+        progress=progress,
+        current_sentence=current_sentence,
+        total_sentences=total_sentences
+    )])
@@ -5,6 +5,7 @@
 import { apiClient } from './client'
 import type {
   Project,
+  ProjectSummary,
   ProjectWithStats,
   CreateProjectRequest,
   PaginatedResponse,
@@ -14,8 +15,8 @@ export const projectsApi = {
   /**
    * Get all projects with optional pagination
    */
-  async getAll(page: number = 1, perPage: number = 20): Promise<PaginatedResponse<ProjectWithStats>> {
-    return apiClient.get<PaginatedResponse<ProjectWithStats>>(
+  async getAll(page: number = 1, perPage: number = 20): Promise<PaginatedResponse<ProjectSummary>> {
+    return apiClient.get<PaginatedResponse<ProjectSummary>>(
       `/api/projects?page=${page}&per_page=${perPage}`
     )
   },
@@ -95,13 +95,17 @@ export interface VerifiedSentence {
   updated_at: string
 }
 
-export interface ProjectWithStats extends Project {
+export interface ProjectSummary extends Project {
   document_count: number
+  supporting_document_count: number
   main_document?: Document
-  supporting_documents: Document[]
   latest_job?: VerificationJob
 }
 
+export interface ProjectWithStats extends ProjectSummary {
+  supporting_documents: Document[]
+}
+
 export interface CreateProjectRequest {
   name: string
   description?: string